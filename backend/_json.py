@@ -0,0 +1,31 @@
+"""JSON helpers that use orjson when it is installed."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - optional speedup
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None  # type: ignore
+
+
+def dumps(obj: Any) -> str:
+    """Serialize ``obj`` to a JSON string."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # e.g. non-string dict keys, which stdlib json coerces
+            pass
+    return json.dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document from ``str`` or ``bytes``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["dumps", "loads"]
@@ -0,0 +1,41 @@
+"""Process-wide caches for heavyweight models."""
+from __future__ import annotations
+
+import functools
+from typing import Optional
+
+
+@functools.lru_cache(maxsize=1)
+def detect_device() -> str:
+    """Return the best available torch device: ``cuda``, then ``mps``, then ``cpu``."""
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return "cuda"
+        mps = getattr(torch.backends, "mps", None)
+        if mps is not None and mps.is_available():
+            return "mps"
+    except Exception:  # pragma: no cover - torch missing or misconfigured
+        pass
+    return "cpu"
+
+
+@functools.lru_cache(maxsize=4)
+def get_embedder(name: str, device: Optional[str] = None):
+    """Return a shared, eval-mode SentenceTransformer for ``name`` on ``device``.
+
+    Loading the model reads ~90MB from disk and initializes torch modules, and
+    the model holds no per-request state, so every caller reuses one instance
+    per ``(name, device)`` pair.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(name, device=device or detect_device())
+    model.eval()
+    if model.device.type == "cuda":
+        model.half()
+    return model
+
+
+__all__ = ["detect_device", "get_embedder"]
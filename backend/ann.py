@@ -0,0 +1,121 @@
+"""Approximate nearest-neighbour search over the corpus embeddings.
+
+Uses a FAISS HNSW graph with inner-product metric, which equals cosine
+similarity because stored vectors are unit length. FAISS is optional: when it
+is not installed, :func:`load_or_build` returns ``None`` and callers keep the
+exact matrix-vector scan.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+try:  # pragma: no cover - optional dependency for tests
+    import numpy as np
+except Exception:  # pragma: no cover - fallback
+    np = None  # type: ignore
+
+try:  # pragma: no cover - optional dependency
+    import faiss  # type: ignore
+except Exception:  # pragma: no cover - fallback to exact search
+    faiss = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+# Below this many rows an exact GEMV is as fast as a graph walk and exact.
+MIN_ROWS = 5000
+_HNSW_M = 32
+_EF_SEARCH = 64
+
+
+class HNSWIndex:
+    """HNSW graph whose internal ids are row positions in the corpus matrix."""
+
+    def __init__(self, index, ids: "np.ndarray", checksum: str = "") -> None:
+        self.index = index
+        self.ids = ids
+        self.checksum = checksum
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, ids: Sequence[int]) -> "HNSWIndex":
+        index = faiss.IndexHNSWFlat(matrix.shape[1], _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = _EF_SEARCH
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        index.add(matrix)
+        return cls(index, np.asarray(ids, dtype=np.int64), _checksum(matrix))
+
+    def search(self, query: np.ndarray, k: int) -> List[int]:
+        """Return row positions of the ``k`` best matches, best first."""
+        k = min(k, self.index.ntotal)
+        if k <= 0:
+            return []
+        _, positions = self.index.search(
+            np.ascontiguousarray(query.reshape(1, -1), dtype=np.float32), k
+        )
+        return [int(pos) for pos in positions[0] if pos >= 0]
+
+    def save(self, path: Path) -> None:
+        faiss.write_index(self.index, str(path))
+        np.save(_ids_path(path), self.ids)
+        _checksum_path(path).write_text(self.checksum, encoding="utf-8")
+
+
+def _ids_path(path: Path) -> Path:
+    return path.with_name(path.name + ".ids.npy")
+
+
+def _checksum_path(path: Path) -> Path:
+    return path.with_name(path.name + ".sum")
+
+
+def _checksum(matrix: np.ndarray) -> str:
+    """Digest of the vectors, so re-embedded segments invalidate the index."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(matrix.shape).encode("ascii"))
+    digest.update(memoryview(matrix).cast("B"))
+    return digest.hexdigest()
+
+
+def load_or_build(
+    matrix: np.ndarray, ids: Sequence[int], path: Optional[Path] = None
+) -> Optional[HNSWIndex]:
+    """Return an index for ``matrix``, reusing the one at ``path`` if current.
+
+    A persisted index is only reused when its stored segment ids match
+    ``ids`` exactly and its checksum matches the vectors (a new model or
+    storage dtype re-embeds the same ids); otherwise it is rebuilt and
+    written back.
+    """
+    if faiss is None or np is None or matrix.shape[0] < MIN_ROWS:
+        return None
+    wanted = np.asarray(ids, dtype=np.int64)
+    if (
+        path is not None
+        and path.exists()
+        and _ids_path(path).exists()
+        and _checksum_path(path).exists()
+    ):
+        try:
+            stored = np.load(_ids_path(path))
+            checksum = _checksum(matrix)
+            if (
+                np.array_equal(stored, wanted)
+                and _checksum_path(path).read_text(encoding="utf-8").strip() == checksum
+            ):
+                return HNSWIndex(faiss.read_index(str(path)), stored, checksum)
+        except Exception as exc:  # pragma: no cover - corrupt cache
+            LOGGER.warning("Ignoring unreadable ANN index at %s: %s", path, exc)
+    LOGGER.info("Building HNSW index over %d segments", matrix.shape[0])
+    built = HNSWIndex.build(matrix, wanted)
+    if path is not None:
+        try:
+            built.save(path)
+        except Exception as exc:  # pragma: no cover - read-only data dir
+            LOGGER.warning("Unable to persist ANN index to %s: %s", path, exc)
+    return built
+
+
+__all__ = ["HNSWIndex", "MIN_ROWS", "load_or_build"]
@@ -2,29 +2,180 @@
 """Video clip extraction utilities using ffmpeg/ffprobe.
 
 - make_clip: extracts a clip starting X ms before and ending Y ms after a segment
-- batch_extract_clips: convenience function for many segments at once
+- batch_extract_clips: convenience function for many segments at once; issues
+  one ffmpeg process per batch of cuts from a media file and runs files on a
+  small thread pool
 
 This module prefers stream copy for speed; if the cut does not align with keyframes,
 it falls back to a fast re-encode.
 """
 from __future__ import annotations
 
-import json
+import functools
+import hashlib
+import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
 
 def _run(cmd: list) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, capture_output=True, text=True)
 
-def get_video_duration_ms(media_path: str) -> int:
-    """Return duration in ms for a media file via ffprobe."""
-    result = _run(['ffprobe', '-v', 'error', '-show_entries',
-                   'format=duration', '-of', 'json', media_path])
+# Only errors are logged and progress output is off, so stderr stays small.
+_FFMPEG = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostats']
+
+def _run_ffmpeg(cmd: list) -> subprocess.CompletedProcess:
+    """Run ffmpeg, discarding stdout and keeping stderr as undecoded bytes."""
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+# Re-encode fallbacks in order of preference; hardware encoders first.
+_ENCODER_ARGS: Dict[str, List[str]] = {
+    'h264_nvenc': ['-preset', 'p4', '-tune', 'll', '-g', '48'],
+    'h264_qsv': ['-preset', 'veryfast'],
+    'h264_videotoolbox': [],
+    'libx264': ['-preset', 'veryfast', '-tune', 'zerolatency', '-threads', '0'],
+}
+
+@functools.lru_cache(maxsize=1)
+def _available_encoders() -> Tuple[str, ...]:
+    """H.264 encoders this ffmpeg build offers, probed once per process.
+
+    Being listed does not guarantee the hardware is present, so callers still
+    fall through to the next encoder on failure; libx264 is always last.
+    """
+    try:
+        res = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                             capture_output=True, text=True)
+        listed = {parts[1] for parts in map(str.split, res.stdout.splitlines())
+                  if len(parts) > 1}
+    except OSError:
+        listed = set()
+    return tuple(enc for enc in _ENCODER_ARGS if enc in listed or enc == 'libx264')
+
+# Hardware encoders found unusable on this machine (listed by ffmpeg but no
+# device or driver); skipped for the rest of the process. Transient failures
+# such as NVENC's concurrent-session limit are not recorded, so the encoder
+# is tried again for the next clip.
+_FAILED_ENCODERS: set = set()
+
+# Lower-cased stderr fragments meaning the encoder cannot start here at all.
+_ENCODER_UNAVAILABLE_MARKERS = (
+    'no nvenc capable devices',
+    'cannot load libnvidia-encode',
+    'cannot load nvcuda',
+    'cannot load libcuda',
+    'driver does not support the required nvenc api',
+    'no device available',
+    'device creation failed',
+    'failed to create a device',
+    'error creating a mfx session',
+    'unsupported device',
+    'cannot open display',
+)
+
+def _encoder_unavailable(res: subprocess.CompletedProcess) -> bool:
+    stderr = (res.stderr or b"").decode("utf-8", errors="replace").lower()
+    return any(marker in stderr for marker in _ENCODER_UNAVAILABLE_MARKERS)
+
+def _stderr_excerpt(res: subprocess.CompletedProcess, limit: int = 300) -> str:
+    return (res.stderr or b"")[:limit * 4].decode("utf-8", errors="replace")[:limit]
+
+@functools.lru_cache(maxsize=1024)
+def _probe_duration_ms(media_path: str, mtime_ns: int, size: int) -> int:
+    # mtime/size are only part of the cache key so a replaced file is re-probed.
+    # default=nw=1:nk=1 prints just the bare duration value, nothing to parse.
+    result = _run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                   '-show_entries', 'format=duration',
+                   '-of', 'default=noprint_wrappers=1:nokey=1', media_path])
     if result.returncode != 0:
         raise RuntimeError(f"ffprobe failed: {result.stderr}")
-    data = json.loads(result.stdout)
-    return int(float(data['format']['duration']) * 1000)
+    try:
+        return int(float(result.stdout.strip()) * 1000)
+    except ValueError:
+        raise RuntimeError(f"ffprobe returned no duration for {media_path}") from None
+
+def get_video_duration_ms(media_path: str) -> int:
+    """Return duration in ms for a media file via ffprobe (memoized per file)."""
+    try:
+        st = os.stat(media_path)
+    except OSError:
+        return _probe_duration_ms(media_path, 0, 0)
+    return _probe_duration_ms(media_path, st.st_mtime_ns, st.st_size)
+
+def _clip_bounds(
+    start_ms: int,
+    end_ms: int,
+    before_ms: int,
+    after_ms: int,
+    video_duration_ms: int,
+) -> Tuple[int, int]:
+    clip_start_ms = max(0, int(start_ms) - int(before_ms))
+    clip_end_ms = min(video_duration_ms, int(end_ms) + int(after_ms))
+    return clip_start_ms, clip_end_ms
+
+def _clip_path(media_path: str, out_dir_path: Path, clip_start_ms: int, clip_end_ms: int) -> Path:
+    # Same-named files in different directories must not share clip names.
+    stem = Path(media_path).stem
+    tag = hashlib.sha1(os.path.abspath(media_path).encode("utf-8")).hexdigest()[:8]
+    return out_dir_path / f"{stem}_{tag}_{clip_start_ms}_{clip_end_ms}.mp4"
+
+def _copy_args(ss: float, duration: float) -> list:
+    """Input-side seek options for a stream-copy cut.
+
+    -ss before -i is a fast keyframe seek; -t (a duration) is used instead of
+    -to so the cut length does not depend on how ffmpeg rebases input
+    timestamps after the seek.
+    """
+    return ['-ss', str(ss), '-t', str(duration)]
+
+def _map_av(index: int) -> list:
+    """Map only the video and audio streams of input ``index``.
+
+    Subtitle, data and attachment streams (e.g. SRT/ASS from MKV, tmcd
+    tracks) are rejected by the mp4 muxer and would fail the stream copy.
+    """
+    return ['-map', f'{index}:v?', '-map', f'{index}:a?']
+
+# -ignore_unknown applies to inputs, so it goes before the first -i.
+_COPY_INPUT_ARGS = ['-ignore_unknown']
+_COPY_OUTPUT_ARGS = ['-c', 'copy',
+                     '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart']
+
+# Cuts per combined ffmpeg run. Each adds an input and an output, so this
+# bounds the command line (Windows caps it near 32K characters) and the
+# number of files ffmpeg holds open at once.
+_MAX_BATCH_CUTS = 32
+
+def _is_complete_mp4(path: Path) -> bool:
+    """Whether ``path`` is a finished mp4 rather than one cut off mid-write.
+
+    Walks the top-level boxes: a finished file has a ``moov`` box and its
+    boxes account for every byte. A process killed or failing mid-mux
+    leaves no ``moov`` or a short ``mdat``.
+    """
+    try:
+        size = path.stat().st_size
+        with open(path, 'rb') as fh:
+            offset, has_moov = 0, False
+            while offset < size:
+                fh.seek(offset)
+                header = fh.read(16)
+                if len(header) < 8:
+                    return False
+                box_size = int.from_bytes(header[:4], 'big')
+                if box_size == 1 and len(header) == 16:
+                    box_size = int.from_bytes(header[8:16], 'big')
+                elif box_size == 0:
+                    box_size = size - offset
+                if box_size < 8:
+                    return False
+                has_moov = has_moov or header[4:8] == b'moov'
+                offset += box_size
+    except OSError:
+        return False
+    return has_moov and offset == size
 
 def make_clip(
     media_path: str,
@@ -33,65 +184,180 @@ def make_clip(
     before_ms: int = 5000,
     after_ms: int = 10000,
     out_dir: str = "clips",
+    video_duration_ms: Optional[int] = None,
 ) -> str:
     """Create a clipped mp4 around a segment with context before/after.
 
     The actual clip is clamped to media duration. If stream copy fails due
     to non-keyframe boundaries, re-encode using libx264 veryfast.
+    Pass ``video_duration_ms`` when already known to skip the ffprobe call.
     """
     out_dir_path = Path(out_dir)
     out_dir_path.mkdir(parents=True, exist_ok=True)
 
-    video_duration_ms = get_video_duration_ms(media_path)
-    clip_start_ms = max(0, int(start_ms) - int(before_ms))
-    clip_end_ms = min(video_duration_ms, int(end_ms) + int(after_ms))
+    if video_duration_ms is None:
+        video_duration_ms = get_video_duration_ms(media_path)
+    clip_start_ms, clip_end_ms = _clip_bounds(
+        start_ms, end_ms, before_ms, after_ms, video_duration_ms
+    )
 
     # Allow very short clips (>= 1s) by design; user can tune windows.
     ss = clip_start_ms / 1000.0
     to = clip_end_ms / 1000.0
+    duration = max(0.0, to - ss)
 
-    stem = Path(media_path).stem
-    out_file = out_dir_path / f"{stem}_{clip_start_ms}_{clip_end_ms}.mp4"
+    out_file = _clip_path(media_path, out_dir_path, clip_start_ms, clip_end_ms)
 
     # Attempt stream copy first
-    cmd_copy = ['ffmpeg', '-y', '-ss', str(ss), '-i', media_path,
-                '-to', str(to), '-c', 'copy', str(out_file)]
-    res = _run(cmd_copy)
+    cmd_copy = (_FFMPEG + ['-y'] + _COPY_INPUT_ARGS + _copy_args(ss, duration)
+                + ['-i', media_path] + _map_av(0) + _COPY_OUTPUT_ARGS + [str(out_file)])
+    res = _run_ffmpeg(cmd_copy)
 
     if res.returncode != 0 or not out_file.exists():
         # Fall back to re-encode at non-keyframe boundaries
-        cmd_encode = ['ffmpeg', '-y', '-ss', str(ss), '-i', media_path,
-                      '-to', str(to), '-c:v', 'libx264', '-preset', 'veryfast',
-                      '-c:a', 'aac', str(out_file)]
-        res2 = _run(cmd_encode)
-        if res2.returncode != 0:
-            raise RuntimeError(f"ffmpeg encode failed: {res2.stderr[:300]}")
+        res2 = None
+        for encoder in _available_encoders():
+            if encoder in _FAILED_ENCODERS:
+                continue
+            cmd_encode = _FFMPEG + ['-y', '-ss', str(ss), '-i', media_path,
+                          '-t', str(duration), '-c:v', encoder, *_ENCODER_ARGS[encoder],
+                          '-pix_fmt', 'yuv420p',
+                          '-c:a', 'aac', '-movflags', '+faststart', str(out_file)]
+            res2 = _run_ffmpeg(cmd_encode)
+            if res2.returncode == 0:
+                break
+            if encoder != 'libx264' and _encoder_unavailable(res2):
+                _FAILED_ENCODERS.add(encoder)
+        if res2 is None or res2.returncode != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {_stderr_excerpt(res2) if res2 else ''}")
 
     return str(out_file)
 
+def _cut_batch(media_path: str, batch: List[Tuple[Tuple[int, int], Path]]) -> None:
+    """Stream-copy every ``((start_ms, end_ms), out_file)`` in one ffmpeg run.
+
+    Failures are not raised: the caller checks which outputs were finished.
+    """
+    # Clear earlier runs' files so anything complete afterwards is this run's.
+    for _, out_file in batch:
+        out_file.unlink(missing_ok=True)
+    cmd = _FFMPEG + ['-y'] + _COPY_INPUT_ARGS
+    for (cs, ce), _ in batch:
+        cmd += _copy_args(cs / 1000.0, max(0.0, (ce - cs) / 1000.0)) + ['-i', media_path]
+    for index, (_, out_file) in enumerate(batch):
+        cmd += _map_av(index) + _COPY_OUTPUT_ARGS + [str(out_file)]
+    try:
+        _run_ffmpeg(cmd)
+    except OSError:
+        # Command line too long for the OS; make_clip cuts them one by one.
+        pass
+
+def _extract_group(
+    media_path: str,
+    segs: List[Dict],
+    before_ms: int,
+    after_ms: int,
+    out_dir: str,
+    video_duration_ms: int,
+) -> List[str]:
+    """Cut the segments of one media file with a few combined ffmpeg runs.
+
+    Each run takes up to ``_MAX_BATCH_CUTS`` cuts; the file is opened once per
+    cut (each input gets its own fast seek) and each input is mapped to its
+    own output, so N clips cost about N / 32 process launches. Clips a run
+    finished are kept even if the run failed overall; the rest are retried
+    with :func:`make_clip`, which also handles the re-encode fallback.
+    """
+    out_dir_path = Path(out_dir)
+    out_dir_path.mkdir(parents=True, exist_ok=True)
+
+    bounds = [
+        _clip_bounds(seg['start_ms'], seg['end_ms'], before_ms, after_ms, video_duration_ms)
+        for seg in segs
+    ]
+    out_files = [_clip_path(media_path, out_dir_path, cs, ce) for cs, ce in bounds]
+
+    cut = set()
+    if len(segs) > 1:
+        # Identical windows map to the same file; only cut it once.
+        unique = list(dict.fromkeys(zip(bounds, out_files)))
+        for start in range(0, len(unique), _MAX_BATCH_CUTS):
+            batch = unique[start:start + _MAX_BATCH_CUTS]
+            if len(batch) == 1:
+                break
+            _cut_batch(media_path, batch)
+            cut.update(out_file for _, out_file in batch if _is_complete_mp4(out_file))
+
+    paths: List[str] = []
+    for seg, out_file in zip(segs, out_files):
+        if out_file in cut:
+            paths.append(str(out_file))
+            continue
+        paths.append(make_clip(
+            media_path,
+            int(seg['start_ms']),
+            int(seg['end_ms']),
+            before_ms=before_ms,
+            after_ms=after_ms,
+            out_dir=out_dir,
+            video_duration_ms=video_duration_ms,
+        ))
+        cut.add(out_file)
+    return paths
+
 def batch_extract_clips(
     segments: List[Dict],
     before_ms: int = 5000,
     after_ms: int = 10000,
     out_dir: str = "clips",
+    max_workers: Optional[int] = None,
 ) -> List[Dict[str, Optional[int]]]:
     """Extract clips for a batch of segments. Each item must contain:
        - 'media_path', 'start_ms', 'end_ms'
-    Returns a list of dicts per input item containing 'clip_path' and 'window_ms'.
+    Returns a list of dicts per input item containing 'clip_path' and 'window_ms',
+    in the same order as ``segments``.
+
+    Segments are grouped by media file and each group is cut by a few
+    combined ffmpeg processes. Groups run concurrently; ffmpeg is already multithreaded, so the
+    pool is capped at ``max_workers`` (default: CPU count).
     """
-    outputs = []
-    for seg in segments:
-        p = make_clip(
-            seg['media_path'],
-            int(seg['start_ms']),
-            int(seg['end_ms']),
-            before_ms=before_ms,
-            after_ms=after_ms,
-            out_dir=out_dir,
+    if not segments:
+        return []
+    groups: Dict[str, List[int]] = {}
+    for index, seg in enumerate(segments):
+        # Spellings of one file share a group, since they share clip names.
+        groups.setdefault(os.path.abspath(seg['media_path']), []).append(index)
+    # Probe each media file once up front rather than once per clip.
+    durations = {path: get_video_duration_ms(path) for path in groups}
+
+    def _run_group(path: str) -> List[str]:
+        return _extract_group(
+            path,
+            [segments[i] for i in groups[path]],
+            before_ms,
+            after_ms,
+            out_dir,
+            durations[path],
         )
-        outputs.append({
-            "clip_path": p,
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(groups)))
+    if workers == 1:
+        group_paths = {path: _run_group(path) for path in groups}
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {path: executor.submit(_run_group, path) for path in groups}
+            group_paths = {path: future.result() for path, future in futures.items()}
+
+    clip_paths: List[Optional[str]] = [None] * len(segments)
+    for path, indexes in groups.items():
+        for index, clip_path in zip(indexes, group_paths[path]):
+            clip_paths[index] = clip_path
+
+    return [
+        {
+            "clip_path": clip_path,
             "window_ms": [max(0, int(seg['start_ms']) - before_ms),
                           int(seg['end_ms']) + after_ms]
-        })
-    return outputs
+        }
+        for seg, clip_path in zip(segments, clip_paths)
+    ]
@@ -1,10 +1,11 @@
 """Configuration helpers for contradiction finder backend."""
 from __future__ import annotations
 
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 try:  # Python 3.11+
     import tomllib as toml_parser
@@ -16,7 +17,17 @@ DEFAULTS: Dict[str, Any] = {
     "DATA_DIR": "data",
     "SAMPLE_DIR": "samples/media",
     "HF_NLI_MODEL": "cross-encoder/nli-deberta-v3-xsmall",
-    "NLI_BACKEND": "hf",
+    "NLI_BACKEND": "auto",
+    "EMBED_STORE_INT8": "0",
+    "EMBED_STORE_DTYPE": "float32",
+    "NLI_CPU_BF16": "auto",
+    "NLI_COMPILE": "0",
+    "NLI_NUM_THREADS": "",
+    "NLI_MAX_LEN": "512",
+    "NLI_CACHE": "1",
+    "NLI_CACHE_SIZE": "200000",
+    "WHISPER_MODEL": "",
+    "WHISPER_COMPUTE_TYPE": "",
 
 }
 
@@ -54,11 +65,8 @@ def _load_toml(path: Path) -> Dict[str, Any]:
     return flattened
 
 
-def get_config() -> Dict[str, Any]:
-    """Return resolved configuration values.
-
-    Precedence: defaults < config.toml < .env < environment variables.
-    """
+@functools.lru_cache(maxsize=8)
+def _resolve_config(env_overrides: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
     config: Dict[str, Any] = dict(DEFAULTS)
     config_path = REPO_ROOT / "config.toml"
     env_path = REPO_ROOT / ".env"
@@ -68,33 +76,51 @@ def get_config() -> Dict[str, Any]:
     # .env overrides config.toml
     config.update(_load_env_file(env_path))
     # Environment variables take highest priority
-    for key in DEFAULTS.keys():
-        if key in os.environ:
-            config[key] = os.environ[key]
+    config.update(env_overrides)
 
     # Normalize to strings for JSON output compatibility
     normalized = {k: str(v) for k, v in config.items()}
     return normalized
 
 
-def ensure_dirs() -> Dict[str, Any]:
-    config = get_config()
-    data_dir = REPO_ROOT / config["DATA_DIR"]
-    transcripts = data_dir / "transcripts"
-    uploads = data_dir / "uploads"
-    db_dir = data_dir / "db"
-    raw_dir = data_dir / "raw"
-    samples_dir = REPO_ROOT / config["SAMPLE_DIR"]
-
-    for path in (data_dir, transcripts, uploads, db_dir, raw_dir):
+def get_config() -> Dict[str, Any]:
+    """Return resolved configuration values.
+
+    Precedence: defaults < config.toml < .env < environment variables.
+    config.toml and .env are parsed once per set of environment overrides;
+    call :func:`reload_config` after editing those files in-process.
+    """
+    env_overrides = tuple((key, os.environ[key]) for key in DEFAULTS if key in os.environ)
+    return dict(_resolve_config(env_overrides))
+
+
+@functools.lru_cache(maxsize=8)
+def _make_dirs(data_dir: str, sample_dir: str) -> None:
+    data_path = REPO_ROOT / data_dir
+    transcripts = data_path / "transcripts"
+    uploads = data_path / "uploads"
+    db_dir = data_path / "db"
+    raw_dir = data_path / "raw"
+    samples_dir = REPO_ROOT / sample_dir
+
+    for path in (data_path, transcripts, uploads, db_dir, raw_dir):
         path.mkdir(parents=True, exist_ok=True)
 
     samples_dir.mkdir(parents=True, exist_ok=True)
 
 
+def ensure_dirs() -> Dict[str, Any]:
+    config = get_config()
+    _make_dirs(config["DATA_DIR"], config["SAMPLE_DIR"])
     return config
 
 
+def reload_config() -> None:
+    """Forget cached configuration and directory checks."""
+    _resolve_config.cache_clear()
+    _make_dirs.cache_clear()
+
+
 if __name__ == "__main__":
     resolved = ensure_dirs()
     print(json.dumps(resolved, indent=2))
@@ -1,9 +1,12 @@
 """SQLite helpers for storing transcripts and embeddings."""
 from __future__ import annotations
 
-import json
+import math
+import sqlite3
+import struct
+from array import array
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 try:  # pragma: no cover - optional dependency for tests
     import numpy as np
@@ -13,19 +16,142 @@ except Exception:  # pragma: no cover - fallback path
 
 from sqlite_utils import Database as SQLiteDatabase
 
+from . import _json
 from .config import REPO_ROOT, ensure_dirs
 from .schemas import Segment
 
 
+# Bumped on every segment write in this process so cached corpus matrices
+# (see HypocrisyDetector) know when to reload.
+_WRITE_COUNTER = 0
+
+_FETCH_BATCH_SIZE = 1024
+
+# PRAGMA user_version at which stored vectors are guaranteed unit length.
+_NORMALIZED_SCHEMA_VERSION = 1
+
+# Unit vectors have every component in [-1, 1], so one global scale suffices.
+_INT8_SCALE = 127.0
+
+_STORE_DTYPES = ("float32", "float16", "int8")
+
+
+def _encode_vector(embedding: Iterable[float], *, dtype: str = "float32") -> Tuple[int, bytes]:
+    """Pack an embedding as an L2-normalized little-endian blob.
+
+    Normalizing once at write time turns cosine similarity into a plain dot
+    product at query time. ``float16`` halves the blob; ``int8`` scales the
+    unit vector by 127 and rounds, which makes it 4x smaller than float32.
+    """
+    if np is not None:
+        vector = np.asarray(embedding, dtype="<f4").ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector = vector / np.float32(norm)
+        return int(vector.size), _pack_unit_rows(vector, dtype).tobytes()
+    values = [float(x) for x in embedding]
+    norm = math.sqrt(sum(x * x for x in values)) or 1.0
+    values = [x / norm for x in values]
+    if dtype == "int8":
+        return len(values), array("b", (max(-127, min(127, round(x * _INT8_SCALE))) for x in values)).tobytes()
+    if dtype == "float16":
+        return len(values), struct.pack(f"<{len(values)}e", *values)
+    return len(values), array("f", values).tobytes()
+
+
+def _pack_unit_rows(unit, dtype: str):
+    if dtype == "int8":
+        return np.clip(np.rint(unit * _INT8_SCALE), -127, 127).astype(np.int8)
+    if dtype == "float16":
+        return unit.astype("<f2")
+    return unit.astype("<f4", copy=False)
+
+
+def _encode_matrix(
+    embeddings: Sequence[Iterable[float]], *, dtype: str = "float32"
+) -> List[Tuple[int, bytes]]:
+    """Vectorized :func:`_encode_vector` for a whole document's embeddings.
+
+    Rows are stacked, normalized and serialized with one ``tobytes`` call and
+    then sliced, instead of paying numpy call overhead per segment.
+    """
+    if np is None or not embeddings:
+        return [_encode_vector(embedding, dtype=dtype) for embedding in embeddings]
+    try:
+        matrix = np.asarray(embeddings, dtype="<f4")
+    except ValueError:
+        matrix = None
+    if matrix is None or matrix.ndim != 2:
+        # Ragged input; fall back to the per-row path.
+        return [_encode_vector(embedding, dtype=dtype) for embedding in embeddings]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = _pack_unit_rows(matrix / np.where(norms > 0, norms, 1).astype(np.float32), dtype)
+    dim = int(matrix.shape[1])
+    raw = np.ascontiguousarray(matrix).tobytes()
+    width = dim * matrix.itemsize
+    return [(dim, raw[offset : offset + width]) for offset in range(0, len(raw), width)]
+
+
+def _decode_vector(blob, dim: Optional[int] = None):
+    """Inverse of :func:`_encode_vector`; also accepts legacy JSON text rows.
+
+    The storage format is inferred from the blob size: one byte per dimension
+    is int8, two is float16, otherwise float32.
+    """
+    if isinstance(blob, str):
+        raw_vector = _json.loads(blob)
+        if np is not None:
+            return np.array(raw_vector, dtype="float32")
+        return [float(x) for x in raw_vector]
+    width = len(blob) // dim if dim else 4
+    if np is not None:
+        if width == 1:
+            return np.frombuffer(blob, dtype=np.int8).astype(np.float32) / np.float32(_INT8_SCALE)
+        if width == 2:
+            return np.frombuffer(blob, dtype="<f2").astype(np.float32)
+        return np.frombuffer(blob, dtype="<f4")
+    if width == 2:
+        return list(struct.unpack(f"<{len(blob) // 2}e", bytes(blob)))
+    unpacked = array("b" if width == 1 else "f")
+    unpacked.frombytes(bytes(blob))
+    if width == 1:
+        return [x / _INT8_SCALE for x in unpacked]
+    return list(unpacked)
+
+
+def _bump_version() -> None:
+    global _WRITE_COUNTER
+    _WRITE_COUNTER += 1
+
+
 class CorpusDatabase:
-    def __init__(self) -> None:
+    def __init__(
+        self, *, store_int8: Optional[bool] = None, store_dtype: Optional[str] = None
+    ) -> None:
         config = ensure_dirs()
+        if store_int8 is None:
+            store_int8 = config.get("EMBED_STORE_INT8", "0").lower() in {"1", "true", "yes", "on"}
+        if store_dtype is None:
+            store_dtype = "int8" if store_int8 else config.get("EMBED_STORE_DTYPE", "float32").lower()
+        if store_dtype not in _STORE_DTYPES:
+            raise ValueError(f"EMBED_STORE_DTYPE must be one of {', '.join(_STORE_DTYPES)}")
+        self.store_dtype = store_dtype
         data_dir = REPO_ROOT / config["DATA_DIR"]
         self.db_path = data_dir / "db" / "corpus.db"
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.db = SQLiteDatabase(self.db_path)
+        self._configure_connection()
         self._ensure_schema()
 
+    def _configure_connection(self) -> None:
+        # WAL lets the API keep reading while an ingest writes; NORMAL sync is
+        # durable in WAL mode apart from the last commits on power loss.
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA temp_store=MEMORY")
+        self.db.execute("PRAGMA cache_size=-65536")
+        self.db.execute("PRAGMA mmap_size=268435456")
+
     def _ensure_schema(self) -> None:
         sources = self.db.table("sources")
         sources.create(
@@ -60,12 +186,14 @@ class CorpusDatabase:
             if_not_exists=True,
         )
         segments.create_index(["doc_id"], if_not_exists=True)
+        segments.create_index(["source_id"], if_not_exists=True)
         embeddings = self.db.table("embeddings")
         embeddings.create(
 
             {
                 "segment_id": int,
-                "vector": str,
+                "dim": int,
+                "vector": bytes,
             },
             pk="segment_id",
             if_not_exists=True,
@@ -84,6 +212,46 @@ class CorpusDatabase:
         if "doc_id" not in segment_cols:
             segments.add_column("doc_id", str, default=None)
 
+        if "dim" not in embeddings.columns_dict:
+            embeddings.add_column("dim", int)
+        self._migrate_vectors()
+        self._fts_enabled = self._ensure_fts(segments)
+
+    @staticmethod
+    def _ensure_fts(segments) -> bool:
+        """Keep an FTS5 index over segment text, synced by triggers."""
+        if segments.detect_fts():
+            return True
+        try:
+            segments.enable_fts(["text"], fts_version="FTS5", create_triggers=True)
+        except sqlite3.OperationalError:  # pragma: no cover - SQLite built without FTS5
+            return False
+        return True
+
+    def _migrate_vectors(self) -> None:
+        """Bring vectors written by older versions up to the current format.
+
+        JSON text rows are rewritten as BLOBs, and databases created before
+        vectors were normalized on write get every row normalized once.
+        """
+        user_version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if user_version >= _NORMALIZED_SCHEMA_VERSION:
+            query = "SELECT segment_id, dim, vector FROM embeddings WHERE typeof(vector) = 'text'"
+        else:
+            query = "SELECT segment_id, dim, vector FROM embeddings"
+        updates = []
+        for segment_id, dim, stored in self.db.execute(query).fetchall():
+            dim, blob = _encode_vector(_decode_vector(stored, dim), dtype=self.store_dtype)
+            updates.append((dim, blob, segment_id))
+        with self.db.conn:
+            if updates:
+                self.db.conn.executemany(
+                    "UPDATE embeddings SET dim = ?, vector = ? WHERE segment_id = ?",
+                    updates,
+                )
+            if user_version < _NORMALIZED_SCHEMA_VERSION:
+                self.db.conn.execute(f"PRAGMA user_version = {_NORMALIZED_SCHEMA_VERSION}")
+
     def add_source(
         self,
         title: str,
@@ -102,14 +270,14 @@ class CorpusDatabase:
             "url_or_path": url_or_path,
             "published_at": published_at.isoformat() if published_at else None,
             "author": author,
-            "extra_json": json.dumps(extra or {}),
+            "extra_json": _json.dumps(extra or {}),
         }
         if existing:
             source_id = existing[0]["id"]
             table.update(source_id, payload)
             return int(source_id)
 
-        source_id = table.insert(payload, pk="id")
+        source_id = table.insert(payload, pk="id").last_pk
 
         return int(source_id)
 
@@ -135,49 +303,158 @@ class CorpusDatabase:
 
             },
             pk="id",
-        )
+        ).last_pk
+        dim, blob = _encode_vector(embedding, dtype=self.store_dtype)
         emb_table = self.db.table("embeddings")
         emb_table.upsert(
             {
                 "segment_id": int(seg_id),
-                "vector": json.dumps(list(embedding)),
+                "dim": dim,
+                "vector": blob,
             },
             pk="segment_id",
         )
+        _bump_version()
         return int(seg_id)
 
+    def add_segments_bulk(
+        self,
+        source_id: int,
+        rows: Sequence[
+            Tuple[str, Optional[float], Optional[float], Iterable[float], Optional[str]]
+        ],
+    ) -> List[int]:
+        """Insert many ``(text, ts_start, ts_end, embedding, doc_id)`` rows.
+
+        Everything is written in a single transaction, so a whole document
+        costs one commit instead of two per segment.
+        """
+        if not rows:
+            return []
+        seg_ids: List[int] = []
+        embedding_rows = []
+        encoded = _encode_matrix([row[3] for row in rows], dtype=self.store_dtype)
+        conn = self.db.conn
+        with conn:
+            for (text, ts_start, ts_end, _, doc_id), (dim, blob) in zip(rows, encoded):
+                cursor = conn.execute(
+                    "INSERT INTO segments (source_id, text, ts_start, ts_end, doc_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (source_id, text, ts_start, ts_end, doc_id),
+                )
+                seg_id = int(cursor.lastrowid)
+                seg_ids.append(seg_id)
+                embedding_rows.append((seg_id, dim, blob))
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (segment_id, dim, vector) VALUES (?, ?, ?)",
+                embedding_rows,
+            )
+        _bump_version()
+        return seg_ids
+
+    def version(self) -> Tuple[int, int]:
+        """Cheap token that changes whenever the corpus may have changed.
+
+        Combines the in-process write counter with SQLite's ``data_version``,
+        which changes when another connection (e.g. a CLI ingest) commits.
+        """
+        data_version = self.db.execute("PRAGMA data_version").fetchone()[0]
+        return _WRITE_COUNTER, int(data_version)
+
     def fetch_segments_with_embeddings(self) -> List[Tuple[Segment, np.ndarray]]:
         segments = []
-        seg_table = self.db.table("segments")
-        emb_table = self.db.table("embeddings")
-        for row in seg_table.rows:
-            try:
-                emb_row = emb_table.get(row["id"])
-                raw_vector = json.loads(emb_row["vector"])
-                if np is not None:
-                    vector = np.array(raw_vector, dtype="float32")
-                else:
-                    vector = [float(x) for x in raw_vector]
-            except KeyError:
-                if np is not None:
+        cursor = self.db.conn.execute(
+            """
+            SELECT s.id, s.source_id, s.text, s.ts_start, s.ts_end, e.dim, e.vector
+            FROM segments s
+            LEFT JOIN embeddings e ON e.segment_id = s.id
+            ORDER BY s.id
+            """
+        )
+        while True:
+            batch = cursor.fetchmany(_FETCH_BATCH_SIZE)
+            if not batch:
+                break
+            for seg_id, source_id, text, ts_start, ts_end, dim, blob in batch:
+                if blob is not None:
+                    vector = _decode_vector(blob, dim)
+                elif np is not None:
                     vector = np.zeros(384, dtype="float32")
                 else:
                     vector = [0.0] * 384
 
-            segments.append(
-                (
-                    Segment(
-                        id=row["id"],
-                        source_id=row["source_id"],
-                        text=row["text"],
-                        ts_start=row.get("ts_start"),
-                        ts_end=row.get("ts_end"),
-                    ),
-                    vector,
+                segments.append(
+                    (
+                        Segment(
+                            id=seg_id,
+                            source_id=source_id,
+                            text=text,
+                            ts_start=ts_start,
+                            ts_end=ts_end,
+                        ),
+                        vector,
+                    )
                 )
-            )
         return segments
 
+    def iter_embeddings(self, dim: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield ``(segment_id, vector)`` pairs straight from the cursor."""
+        sql = "SELECT segment_id, dim, vector FROM embeddings"
+        params: list = []
+        if dim is not None:
+            sql += " WHERE dim = ?"
+            params.append(dim)
+        cursor = self.db.conn.execute(sql + " ORDER BY segment_id", params)
+        while True:
+            batch = cursor.fetchmany(_FETCH_BATCH_SIZE)
+            if not batch:
+                break
+            for seg_id, row_dim, blob in batch:
+                yield seg_id, _decode_vector(blob, row_dim)
+
+    def load_embedding_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, matrix)`` for every embedding of the dominant size.
+
+        The float32 matrix is preallocated and filled row by row, so no
+        per-segment Python objects are kept alive. Requires numpy.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required to load the embedding matrix")
+        row = self.db.execute(
+            "SELECT dim, COUNT(*) FROM embeddings WHERE dim IS NOT NULL "
+            "GROUP BY dim ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        if not row:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        dim, count = int(row[0]), int(row[1])
+        ids = np.empty(count, dtype=np.int64)
+        matrix = np.empty((count, dim), dtype=np.float32)
+        filled = 0
+        for seg_id, vector in self.iter_embeddings(dim):
+            if filled == count:  # rows added since the COUNT(*)
+                break
+            ids[filled] = seg_id
+            matrix[filled] = vector
+            filled += 1
+        return ids[:filled], matrix[:filled]
+
+    def fetch_segments(self, ids: Sequence[int]) -> List[Segment]:
+        """Load segments by id, returned in the order of ``ids``."""
+        wanted = [int(seg_id) for seg_id in ids]
+        if not wanted:
+            return []
+        placeholders = ",".join("?" for _ in wanted)
+        rows = self.db.execute(
+            "SELECT id, source_id, text, ts_start, ts_end FROM segments "
+            f"WHERE id IN ({placeholders})",
+            wanted,
+        ).fetchall()
+        by_id = {
+            row[0]: Segment(id=row[0], source_id=row[1], text=row[2], ts_start=row[3], ts_end=row[4])
+            for row in rows
+        }
+        return [by_id[seg_id] for seg_id in wanted if seg_id in by_id]
+
     def fetch_source(self, source_id: int):
         table = self.db.table("sources")
         try:
@@ -186,6 +463,24 @@ class CorpusDatabase:
             return {}
 
     def search_segments(self, query: str, limit: int = 10) -> List[Segment]:
+        if self._fts_enabled:
+            # Quote as a single phrase so user input is never parsed as FTS syntax.
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = self.db.execute(
+                """
+                SELECT s.id, s.source_id, s.text, s.ts_start, s.ts_end
+                FROM segments_fts
+                JOIN segments s ON s.id = segments_fts.rowid
+                WHERE segments_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                [phrase, limit],
+            ).fetchall()
+            return [
+                Segment(id=seg_id, source_id=source_id, text=text, ts_start=ts_start, ts_end=ts_end)
+                for seg_id, source_id, text, ts_start, ts_end in rows
+            ]
         seg_table = self.db.table("segments")
         pattern = f"%{query}%"
         rows = seg_table.rows_where("text LIKE ?", [pattern], limit=limit)
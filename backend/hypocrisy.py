@@ -1,18 +1,15 @@
 """Hypocrisy detection by comparing statements against the corpus."""
 from __future__ import annotations
 
-import json
-import math
-from typing import List
+from typing import List, Tuple
 
 try:  # pragma: no cover - optional dependency for tests
     import numpy as np
 except Exception:  # pragma: no cover - fallback
     np = None  # type: ignore
 
-
-from sentence_transformers import SentenceTransformer
-
+from . import _json, ann
+from ._models import get_embedder
 from .db import CorpusDatabase
 from .nli import NLIScorer
 from .schemas import HypocrisyHit
@@ -24,18 +21,68 @@ class HypocrisyDetector:
     def __init__(self, scorer: NLIScorer | None = None) -> None:
         self.db = CorpusDatabase()
         self.scorer = scorer or NLIScorer()
-        self.embedder = SentenceTransformer(_EMBED_MODEL)
+        self.embedder = get_embedder(_EMBED_MODEL)
+        self._corpus_version: Tuple[int, int] | None = None
+        self._corpus_ids = None
+        self._corpus_matrix = None
+        self._ann_index: ann.HNSWIndex | None = None
+
+    def _load_corpus(self) -> None:
+        """(Re)build the (N, D) corpus matrix if the DB changed.
+
+        Stored vectors are unit length (see ``CorpusDatabase``), so rows are
+        used as-is and cosine similarity is a plain dot product. Only ids and
+        vectors are held; segment text is loaded for the top hits on demand.
+        """
+        version = self.db.version()
+        if version == self._corpus_version:
+            return
+        ids, matrix = self.db.load_embedding_matrix()
+        self._corpus_version = version
+        self._ann_index = None
+        if ids.size == 0:
+            self._corpus_ids, self._corpus_matrix = None, None
+            return
+        self._corpus_ids = ids
+        self._corpus_matrix = matrix
+        # Large corpora get an HNSW graph (when faiss is installed) so lookups
+        # stop scaling linearly with corpus size.
+        self._ann_index = ann.load_or_build(
+            matrix, ids, self.db.db_path.with_name("corpus.hnsw")
+        )
 
     def _candidate_segments(self, text: str, limit: int = 25):
+        if np is None:
+            return self._candidate_segments_py(text, limit)
+        self._load_corpus()
+        matrix = self._corpus_matrix
+        if matrix is None:
+            return []
+        query_vec = np.asarray(
+            self.embedder.encode([text], normalize_embeddings=True)[0], dtype=np.float32
+        )
+        if query_vec.shape[0] != matrix.shape[1]:
+            return []
+        if self._ann_index is not None:
+            idx = self._ann_index.search(query_vec, limit)
+        else:
+            sims = matrix @ query_vec
+            limit = min(limit, sims.shape[0])
+            if limit < sims.shape[0]:
+                idx = np.argpartition(-sims, limit - 1)[:limit]
+            else:
+                idx = np.arange(sims.shape[0])
+            idx = idx[np.argsort(-sims[idx], kind="stable")]
+        return self.db.fetch_segments(self._corpus_ids[idx])
+
+    def _candidate_segments_py(self, text: str, limit: int = 25):
         segments = self.db.fetch_segments_with_embeddings()
         if not segments:
             return []
-        query_vec = self.embedder.encode([text])[0]
-        query_norm = _norm(query_vec) or 1.0
+        query_vec = self.embedder.encode([text], normalize_embeddings=True)[0]
         results = []
         for segment, vector in segments:
-            denom = (_norm(vector) or 1.0) * query_norm
-            similarity = float(_dot(query_vec, vector) / denom)
+            similarity = _dot(query_vec, vector)
 
             results.append((segment, similarity))
         results.sort(key=lambda item: item[1], reverse=True)
@@ -57,7 +104,7 @@ class HypocrisyDetector:
             extra = {}
             if source and source.get("extra_json"):
                 try:
-                    extra = json.loads(source["extra_json"])
+                    extra = _json.loads(source["extra_json"])
                 except Exception:  # pragma: no cover - defensive parsing
                     extra = {}
 
@@ -77,12 +124,6 @@ class HypocrisyDetector:
         return hits
 
 
-def _norm(vector) -> float:
-    if np is not None:
-        return float(np.linalg.norm(vector))
-    return math.sqrt(sum(float(x) * float(x) for x in vector))
-
-
 def _dot(a, b) -> float:
     if np is not None:
         return float(np.dot(a, b))
@@ -1,10 +1,11 @@
 
 import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from ._models import get_embedder
 
 class EmbeddingRetriever:
     def __init__(self, db_path: str, embed_model_dir: str = "backend/embed_model", model_name: str = "all-MiniLM-L6-v2"):
@@ -12,7 +13,9 @@ class EmbeddingRetriever:
         self.embed_model_dir = embed_model_dir
         # Load local model if downloaded; else fallback to remote
         model_path = embed_model_dir if Path(embed_model_dir).exists() else model_name
-        self.model = SentenceTransformer(model_path)
+        self.model = get_embedder(model_path)
+        self._ids: Optional[np.ndarray] = None
+        self._mat: Optional[np.ndarray] = None
 
     # --- DB helpers ---
     def _connect(self):
@@ -36,28 +39,53 @@ class EmbeddingRetriever:
             out.append((seg_id, vec))
         return out
 
+    def _load_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack all embeddings into one contiguous N x D matrix, once."""
+        if self._mat is None or self._ids is None:
+            items = self.get_segments_with_embeddings()
+            if items:
+                ids, mat = zip(*items)
+                self._ids = np.asarray(ids, dtype=np.int64)
+                self._mat = np.ascontiguousarray(np.stack(mat, axis=0), dtype=np.float32)
+            else:
+                self._ids = np.empty(0, dtype=np.int64)
+                self._mat = np.empty((0, 0), dtype=np.float32)
+        return self._ids, self._mat
+
+    def invalidate(self) -> None:
+        """Drop the cached matrix; call after new embeddings are written."""
+        self._ids = None
+        self._mat = None
+
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         q = self.encode(query)
-        items = self.get_segments_with_embeddings()
-        if not items:
+        ids, M = self._load_matrix()  # N x D
+        if ids.size == 0:
             return []
-        ids, mat = zip(*items)
-        M = np.stack(mat, axis=0)  # N x D
         # Cosine similarities since vectors are normalized
-        sims = (M @ q).tolist()
-        ranked = sorted(zip(ids, sims), key=lambda x: x[1], reverse=True)[:top_k]
+        sims = M @ q
+        # O(N) selection of the top_k, then sort only those k
+        k = min(top_k, sims.shape[0])
+        if k <= 0:
+            return []
+        idx = np.argpartition(-sims, k - 1)[:k] if k < sims.shape[0] else np.arange(k)
+        idx = idx[np.argsort(-sims[idx], kind="stable")]
+        ranked = [(int(ids[i]), float(sims[i])) for i in idx]
 
-        # Fetch segment + doc metadata
+        # Fetch segment + doc metadata for all hits in one query
         con = self._connect()
         cur = con.cursor()
+        placeholders = ",".join("?" for _ in ranked)
+        cur.execute(f"""
+            SELECT s.id, s.start_ms, s.end_ms, s.text, d.id, d.source, d.url, d.date, d.title, d.media_path
+            FROM segments s JOIN documents d ON s.document_id = d.id
+            WHERE s.id IN ({placeholders})
+        """, [seg_id for seg_id, _ in ranked])
+        rows = {row[0]: row for row in cur.fetchall()}
+        con.close()
         results = []
         for seg_id, score in ranked:
-            cur.execute("""
-                SELECT s.id, s.start_ms, s.end_ms, s.text, d.id, d.source, d.url, d.date, d.title, d.media_path
-                FROM segments s JOIN documents d ON s.document_id = d.id
-                WHERE s.id = ?
-            """, (seg_id,))
-            row = cur.fetchone()
+            row = rows.get(seg_id)
             if row:
                 results.append({
                     "segment_id": row[0],
@@ -72,5 +100,4 @@ class EmbeddingRetriever:
                     "media_path": row[9],
                     "embed_score": float(score),
                 })
-        con.close()
         return results
@@ -3,11 +3,13 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import json
+import hashlib
+import os
 import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import Iterable, Iterator, List, Sequence, Tuple
 
 
 try:  # pragma: no cover - imported lazily for helpful errors
@@ -25,11 +27,18 @@ try:  # pragma: no cover
 except ImportError:  # pragma: no cover
     SentenceTransformer = None  # type: ignore
 
-from .config import REPO_ROOT, ensure_dirs
+from . import _json
+from ._models import get_embedder
+from .config import REPO_ROOT, ensure_dirs, get_config
 from .db import CorpusDatabase
 
 _MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
-_EMBEDDER = None
+# Statements are encoded in length-sorted chunks of this size so each
+# tokenizer batch pads to similar lengths and peak memory stays bounded.
+_ENCODE_BATCH_SIZE = 64
+# Bump whenever subtitle parsing or normalization changes, so cached
+# results from the old code are re-parsed instead of served.
+_SUBTITLE_CACHE_VERSION = 1
 
 
 
@@ -40,49 +49,77 @@ def _repo_path(path: str | Path) -> Path:
     return REPO_ROOT / candidate
 
 
-def _load_subtitle(path: Path) -> List[Tuple[str, float | None, float | None]]:
+def _read_subtitle_text(path: Path) -> str:
+    # A binary read fetches the whole file in one readall() sized from fstat and
+    # decodes once, skipping TextIOWrapper's chunked decode + newline pass.
+    with open(path, "rb") as handle:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return handle.read().decode("utf-8-sig")
+
+
+def _load_subtitle(path: Path) -> Iterator[Tuple[str, float | None, float | None]]:
+    """Yield ``(text, start, end)`` cues from ``path`` without materializing them all."""
     if path.suffix.lower() == ".srt":
         if srt is None:
             raise RuntimeError("Install the 'srt' package to parse subtitle files")
-        content = path.read_text(encoding="utf-8")
-        subtitles = list(srt.parse(content))
-        return [
-            (subtitle.content.replace("\n", " ").strip(), subtitle.start.total_seconds(), subtitle.end.total_seconds())
-            for subtitle in subtitles
-            if subtitle.content.strip()
-        ]
+        # srt.parse is lazy, so cues are decoded one at a time as they are consumed.
+        for subtitle in srt.parse(_read_subtitle_text(path)):
+            if subtitle.content.strip():
+                yield (
+                    subtitle.content.replace("\n", " ").strip(),
+                    subtitle.start.total_seconds(),
+                    subtitle.end.total_seconds(),
+                )
+        return
     if path.suffix.lower() == ".vtt":
         if webvtt is None:
             raise RuntimeError("Install the 'webvtt-py' package to parse VTT files")
-        captions = webvtt.read(str(path))
-        results = []
-        for caption in captions:
+        for caption in webvtt.read(str(path)):
             text = caption.text.replace("\n", " ").strip()
-            if not text:
-                continue
-            start = caption.start_in_seconds
-            end = caption.end_in_seconds
-            results.append((text, start, end))
-        return results
+            if text:
+                yield (text, caption.start_in_seconds, caption.end_in_seconds)
+        return
     raise ValueError("Unsupported subtitle format. Use .srt or .vtt")
 
 
+def _collapse_whitespace(text: str) -> str:
+    # Most cues are already clean: printable (no tabs/newlines/NBSP), single
+    # spaced and trimmed. Those skip the split/join allocation entirely.
+    if text.isprintable() and "  " not in text and text[:1] != " " and text[-1:] != " ":
+        return text
+    return " ".join(text.split())
+
+
 def _normalize_statements(statements: Iterable[Tuple[str, float | None, float | None]]):
     normalized = []
     for text, start, end in statements:
-        cleaned = " ".join(text.split())
+        cleaned = _collapse_whitespace(text)
         if cleaned:
             normalized.append((cleaned, start, end))
     return normalized
 
 
 def _ensure_embedder():
-    global _EMBEDDER
     if SentenceTransformer is None:
         raise RuntimeError("Install sentence-transformers to generate embeddings")
-    if _EMBEDDER is None:
-        _EMBEDDER = SentenceTransformer(_MODEL_NAME)
-    return _EMBEDDER
+    # Shared with the detector and index, so the API process loads it once.
+    return get_embedder(_MODEL_NAME)
+
+
+def _encode_statements(embedder, texts: Sequence[str]) -> list:
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings: list = [None] * len(texts)
+    for start in range(0, len(order), _ENCODE_BATCH_SIZE):
+        chunk = order[start : start + _ENCODE_BATCH_SIZE]
+        vectors = embedder.encode(
+            [texts[i] for i in chunk],
+            batch_size=_ENCODE_BATCH_SIZE,
+            show_progress_bar=False,
+        )
+        for index, vector in zip(chunk, vectors):
+            embeddings[index] = vector
+    return embeddings
 
 
 def _ingest_segments(
@@ -99,7 +136,7 @@ def _ingest_segments(
     if not statements:
         return 0
     embedder = _ensure_embedder()
-    embeddings = embedder.encode([text for text, _, _ in statements])
+    embeddings = _encode_statements(embedder, [text for text, _, _ in statements])
 
     db = CorpusDatabase()
     try:
@@ -117,28 +154,52 @@ def _ingest_segments(
         extra=extra,
     )
 
-    for index, ((text, start, end), vector) in enumerate(zip(statements, embeddings), start=1):
-        doc_id = f"{doc_id_prefix}:{index}" if doc_id_prefix else None
-        db.add_segment(
-            source_id=source_id,
-            text=text,
-            ts_start=start,
-            ts_end=end,
-            embedding=vector,
-            doc_id=doc_id,
-        )
+    rows = [
+        (text, start, end, vector, f"{doc_id_prefix}:{index}" if doc_id_prefix else None)
+        for index, ((text, start, end), vector) in enumerate(zip(statements, embeddings), start=1)
+    ]
+    db.add_segments_bulk(source_id, rows)
     return len(statements)
 
 
 
-def ingest_subtitle(subtitle_path: Path, source_title: str | None = None) -> int:
-    ensure_dirs()
-    subtitle_path = _repo_path(subtitle_path)
-    if not subtitle_path.exists():
-        print(f"Subtitle file not found: {subtitle_path}", file=sys.stderr)
-        return 0
+def _subtitle_cache_path(path: Path) -> Path:
+    digest = hashlib.blake2b(str(path.resolve()).encode("utf-8"), digest_size=16).hexdigest()
+    return REPO_ROOT / get_config()["DATA_DIR"] / "cache" / "subtitles" / f"{digest}.json"
+
+
+def _parse_subtitle_file(path: Path) -> List[Tuple[str, float | None, float | None]]:
+    """Parse and normalize ``path``, reusing the cached result if unchanged.
+
+    One cache file per subtitle path holds its ``(mtime_ns, size)`` stamp and
+    the parser's cache version, so an edited file or changed parser is
+    re-parsed and the cache never grows past one entry per source file.
+    """
+    stat = path.stat()
+    stamp = [_SUBTITLE_CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+    cache_path = _subtitle_cache_path(path)
+    try:
+        cached = _json.loads(cache_path.read_bytes())
+        if cached.get("stamp") == stamp:
+            return [tuple(statement) for statement in cached["statements"]]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    statements = _normalize_statements(_load_subtitle(path))
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(_json.dumps({"stamp": stamp, "statements": statements}), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:  # pragma: no cover - cache is best effort
+        print(f"Could not cache parsed subtitles: {exc}", file=sys.stderr)
+    return statements
+
 
-    statements = _normalize_statements(_load_subtitle(subtitle_path))
+def _store_subtitle_statements(
+    subtitle_path: Path,
+    statements: Sequence[Tuple[str, float | None, float | None]],
+    source_title: str | None,
+) -> int:
     if not statements:
         print("No statements found in subtitle file", file=sys.stderr)
         return 0
@@ -156,6 +217,43 @@ def ingest_subtitle(subtitle_path: Path, source_title: str | None = None) -> int
     return count
 
 
+def ingest_subtitle(subtitle_path: Path, source_title: str | None = None) -> int:
+    ensure_dirs()
+    subtitle_path = _repo_path(subtitle_path)
+    if not subtitle_path.exists():
+        print(f"Subtitle file not found: {subtitle_path}", file=sys.stderr)
+        return 0
+    return _store_subtitle_statements(subtitle_path, _parse_subtitle_file(subtitle_path), source_title)
+
+
+def ingest_subtitles(subtitle_paths: Iterable[Path], max_workers: int | None = None) -> int:
+    """Ingest several subtitle files, parsing ahead in worker processes.
+
+    Parsing is pure Python and CPU bound, so it runs in a process pool while
+    this process encodes and stores the files that are already parsed. The
+    embedder stays loaded once, in this process.
+    """
+    ensure_dirs()
+    paths = []
+    for path in subtitle_paths:
+        path = _repo_path(path)
+        if path.exists():
+            paths.append(path)
+        else:
+            print(f"Subtitle file not found: {path}", file=sys.stderr)
+    if len(paths) <= 1:
+        return sum(ingest_subtitle(path) for path in paths)
+
+    total = 0
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields in order as each parse finishes, so encoding file N
+        # overlaps with parsing files N+1.. in the pool.
+        for path, statements in zip(paths, pool.map(_parse_subtitle_file, paths)):
+            total += _store_subtitle_statements(path, statements, None)
+    return total
+
+
 def ingest_text_file(text_path: Path, source_title: str | None = None) -> int:
     ensure_dirs()
     text_path = _repo_path(text_path)
@@ -205,7 +303,9 @@ def ingest_scraped_items(items: Iterable[dict | object]) -> int:
     ensure_dirs()
     total = 0
     for raw in items:
-        if hasattr(raw, "dict"):
+        if hasattr(raw, "model_dump"):
+            data = raw.model_dump()  # type: ignore[attr-defined]
+        elif hasattr(raw, "dict"):
             data = raw.dict()  # type: ignore[attr-defined]
         elif isinstance(raw, dict):
             data = raw
@@ -275,10 +375,10 @@ def ingest_from_scraped_sqlite(path: Path) -> int:
                 "source_name": getter("source_name"),
                 "published_at": getter("published_at"),
                 "author": getter("author"),
-                "media_urls": json.loads(media_blob) if media_blob else [],
+                "media_urls": _json.loads(media_blob) if media_blob else [],
                 "raw_html": getter("raw_html"),
                 "license": getter("license"),
-                "extra": json.loads(extra_blob) if extra_blob else {},
+                "extra": _json.loads(extra_blob) if extra_blob else {},
             }
         )
     conn.close()
@@ -287,7 +387,7 @@ def ingest_from_scraped_sqlite(path: Path) -> int:
 
 def main(argv: List[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Ingest content into the hypocrisy corpus")
-    parser.add_argument("--srt", help="Path to .srt subtitle file")
+    parser.add_argument("--srt", nargs="+", help="Path(s) to .srt or .vtt subtitle files")
     parser.add_argument("--text", help="Path to plain text file")
     parser.add_argument("--from-scraped", help="Path to scraped sqlite database")
  
@@ -295,8 +395,10 @@ def main(argv: List[str] | None = None) -> int:
     args = parser.parse_args(argv)
 
     try:
-        if args.srt:
-            count = ingest_subtitle(Path(args.srt), source_title=args.title)
+        if args.srt and len(args.srt) == 1:
+            count = ingest_subtitle(Path(args.srt[0]), source_title=args.title)
+        elif args.srt:
+            count = ingest_subtitles([Path(path) for path in args.srt])
         elif args.text:
             count = ingest_text_file(Path(args.text), source_title=args.title)
         elif args.from_scraped:
@@ -1,10 +1,14 @@
 """Natural language inference scoring helpers."""
 from __future__ import annotations
 
+import functools
 import logging
 import os
+import platform
+import threading
 from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 try:  # pragma: no cover - optional dependency for tests
     import numpy as np
@@ -14,78 +18,223 @@ except Exception:  # pragma: no cover - fallback for environments without numpy
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
+from ._models import detect_device
 from .config import REPO_ROOT, ensure_dirs, get_config
+from .nli_cache import ScoreCache
 
 
 LOGGER = logging.getLogger(__name__)
 
+# The Rust tokenizer only parallelizes batch encoding when allowed to; this
+# module never forks after tokenizing, which is what the default guards against.
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+_CONTRADICTION_IDX = 0
+# Upper bound on tokens per pair; lower it (NLI_MAX_LEN) when statements are
+# short to cut attention cost on the occasional long outlier.
+_MAX_SEQ_LENGTH = 512
+_SCORE_BATCH_SIZE = 32
+# Rough padded-token budget per forward pass; token counts are estimated as
+# characters / 4, which is close enough for English BPE/SentencePiece vocabularies.
+_MAX_BATCH_TOKENS = 16384
+
 
 @dataclass
 class _PytorchBackend:
     tokenizer: AutoTokenizer
     model: AutoModelForSequenceClassification
+    device: str = "cpu"
+    autocast_dtype: Optional[torch.dtype] = None
+    use_token_type_ids: bool = True
+
+    def cache_tag(self) -> str:
+        """What, besides the model name, changes this backend's scores."""
+        dtype = str(self.autocast_dtype or torch.float32).replace("torch.", "")
+        return f"torch|{self.device}|{dtype}"
 
     def score(self, pairs: Sequence[Tuple[str, str]]):
+        # All pairs go through the model as one padded batch.
+        premises, hypotheses = map(list, zip(*pairs))
         inputs = self.tokenizer(
-            [premise for premise, _ in pairs],
-            [hypothesis for _, hypothesis in pairs],
+            premises,
+            hypotheses,
             padding=True,
             truncation=True,
+            # Rounding the padded length up to a multiple of 8 limits the set
+            # of tensor shapes, so the caching allocator reuses blocks between
+            # calls; it also keeps GEMMs tensor-core aligned on CUDA.
+            pad_to_multiple_of=8,
+            return_attention_mask=True,
+            return_token_type_ids=self.use_token_type_ids,
             return_tensors="pt",
         )
-        with torch.no_grad():
+        if self.device == "cuda":
+            inputs = {
+                key: value.pin_memory().to(self.device, non_blocking=True)
+                for key, value in inputs.items()
+            }
+        else:
+            inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        device_type = "cuda" if self.device == "cuda" else "cpu"
+        with torch.inference_mode(), torch.autocast(
+            device_type=device_type,
+            dtype=self.autocast_dtype or torch.float32,
+            enabled=self.autocast_dtype is not None,
+        ):
             outputs = self.model(**inputs)
-        logits = outputs.logits
-        probs = torch.softmax(logits, dim=-1)
-        contradiction_idx = 0 if probs.shape[-1] == 1 else 0
-        # huggingface cross-encoders typically use [contradiction, neutral, entailment]
-        if probs.shape[-1] >= 3:
-            contradiction_idx = 0
-        elif probs.shape[-1] == 2:
-            # binary classification - assume index 0 is contradiction
-            contradiction_idx = 0
-        return probs[:, contradiction_idx].cpu().numpy().tolist()
+        logits = outputs.logits.float()
+        # Cross-encoders use [contradiction, neutral, entailment] (or
+        # [contradiction, other] for binary heads), so column 0 is the score.
+        return torch.softmax(logits, dim=-1)[:, _CONTRADICTION_IDX].cpu().tolist()
 
 
 @dataclass
 class _OnnxBackend:
     session: "onnxruntime.InferenceSession"
     tokenizer: AutoTokenizer
+    model_path: Optional[Path] = None
+
+    def __post_init__(self) -> None:
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def cache_tag(self) -> str:
+        """What, besides the model name, changes this backend's scores.
+
+        The file's mtime and size make a re-export start a fresh cache.
+        """
+        provider = self.session.get_providers()[0]
+        if self.model_path is None:
+            return f"onnx|{provider}"
+        stat = self.model_path.stat()
+        return f"onnx|{provider}|{self.model_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
 
     def score(self, pairs: Sequence[Tuple[str, str]]):
+        premises, hypotheses = map(list, zip(*pairs))
         inputs = self.tokenizer(
-            [premise for premise, _ in pairs],
-            [hypothesis for _, hypothesis in pairs],
+            premises,
+            hypotheses,
             padding=True,
             truncation=True,
+            return_attention_mask=True,
+            return_token_type_ids="token_type_ids" in self.input_names,
             return_tensors="np",
         )
-        ort_inputs = {k: v for k, v in inputs.items()}
+        ort_inputs = {k: v for k, v in inputs.items() if k in self.input_names}
         outputs = self.session.run(None, ort_inputs)
-        logits = outputs[0]
-        exp = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
-        probs = exp / exp.sum(axis=-1, keepdims=True)
-        contradiction_idx = 0
-        if probs.shape[-1] >= 3:
-            contradiction_idx = 0
-        elif probs.shape[-1] == 2:
-            contradiction_idx = 0
-        return probs[:, contradiction_idx].tolist()
+        # Only the contradiction probability is needed, and softmax_0 equals
+        # 1 / sum_j exp(l_j - l_0): one exp pass and no normalized matrix.
+        logits = np.asarray(outputs[0], dtype=np.float32)
+        with np.errstate(over="ignore"):
+            shifted = np.exp(logits - logits[:, _CONTRADICTION_IDX : _CONTRADICTION_IDX + 1])
+        return (1.0 / shifted.sum(axis=-1)).tolist()
+
+
+def _configured_threads(value: str) -> int:
+    """Thread count from ``NLI_NUM_THREADS``, else the CPUs this process may use.
+
+    ``sched_getaffinity`` honours container CPU pinning, unlike ``cpu_count``.
+    """
+    if str(value).strip():
+        try:
+            return max(1, int(value))
+        except ValueError:
+            LOGGER.warning("Ignoring non-integer NLI_NUM_THREADS=%r", value)
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+@functools.lru_cache(maxsize=1)
+def _apply_torch_threads(count: int) -> None:
+    # Once per process (per count): every NLIScorer construction calls this.
+    # OMP/MKL env vars are read when torch is imported, so only the torch
+    # setters have any effect here.
+    torch.set_num_threads(count)
+    try:
+        torch.set_num_interop_threads(max(1, count // 4))
+    except RuntimeError:
+        # Only settable before the first inter-op parallel work has run.
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _cpu_has_int8_dot() -> bool:
+    """True when the CPU has VNNI (x86) or SDOT/UDOT (arm64) int8 instructions."""
+    machine = platform.machine().lower()
+    if machine in {"arm64", "aarch64"}:
+        # Apple silicon and ARMv8.2+ server cores all ship the dot-product extension.
+        return platform.system() == "Darwin" or _cpu_flags() & {"asimddp"} != set()
+    return bool(_cpu_flags() & {"avx512_vnni", "avx_vnni", "amx_int8"})
+
+
+def _cpu_flags() -> set:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith(("flags", "Features")):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def _use_cpu_bf16(setting: str) -> bool:
+    """bf16 only beats fp32 on CPUs with native bf16 math (AVX-512-BF16 / AMX)."""
+    setting = setting.strip().lower()
+    if setting == "auto":
+        return bool(_cpu_flags() & {"avx512_bf16", "amx_bf16"})
+    return setting in {"1", "true", "yes", "on"}
+
+
+def _ipex_optimize(model):
+    try:
+        import intel_extension_for_pytorch as ipex  # type: ignore
+    except ImportError:
+        return model
+    try:
+        return ipex.optimize(model, dtype=torch.bfloat16)
+    except Exception as exc:  # pragma: no cover - depends on ipex/torch versions
+        LOGGER.warning("ipex.optimize failed, using stock PyTorch kernels: %s", exc)
+        return model
+
+
+# Loaded backends are stateless across calls, so every scorer for the same
+# model and backend shares one instead of reloading weights per instance.
+_BACKENDS: Dict[Tuple[str, str, int], object] = {}
+_BACKENDS_LOCK = threading.Lock()
+_CACHES: Dict[str, ScoreCache] = {}
 
 
 class NLIScorer:
     """Score hypothesis/premise pairs using PyTorch or ONNX."""
 
-    def __init__(self, model_name: str | None = None) -> None:
+    def __init__(
+        self,
+        model_name: str | None = None,
+        *,
+        batch_size: int = _SCORE_BATCH_SIZE,
+        max_batch_tokens: int = _MAX_BATCH_TOKENS,
+    ) -> None:
         config = get_config()
         ensure_dirs()
         self.model_name = model_name or config.get(
             "HF_NLI_MODEL", "cross-encoder/nli-deberta-v3-xsmall"
         )
         self.backend_preference = os.environ.get(
-            "NLI_BACKEND", config.get("NLI_BACKEND", "hf")
+            "NLI_BACKEND", config.get("NLI_BACKEND", "auto")
         ).lower()
-        self.backend = self._load_backend()
+        self.num_threads = _configured_threads(config.get("NLI_NUM_THREADS", ""))
+        _apply_torch_threads(self.num_threads)
+        self.batch_size = max(1, batch_size)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_seq_length = max(8, int(config.get("NLI_MAX_LEN", _MAX_SEQ_LENGTH)))
+        key = (self.model_name, self.backend_preference, self.max_seq_length)
+        with _BACKENDS_LOCK:
+            backend = _BACKENDS.get(key)
+            if backend is None:
+                backend = _BACKENDS[key] = self._load_backend()
+        self.backend = backend
+        self.cache = self._load_cache(config)
 
     def _load_tokenizer(self) -> AutoTokenizer:
         last_exc: Exception | None = None
@@ -97,6 +246,9 @@ class NLIScorer:
             try:
                 LOGGER.debug("Loading tokenizer with args %s", kwargs)
                 tokenizer = AutoTokenizer.from_pretrained(self.model_name, **kwargs)
+                if tokenizer.model_max_length > self.max_seq_length:
+                    # Also replaces the "unlimited" sentinel (1e30) some configs leave.
+                    tokenizer.model_max_length = self.max_seq_length
                 return tokenizer
             except Exception as exc:  # pragma: no cover - best-effort logging
                 last_exc = exc
@@ -105,30 +257,51 @@ class NLIScorer:
 
     def _load_backend(self):
         preference = self.backend_preference
-        if preference == "onnx":
-            backend = self._load_onnx_backend()
+        if preference in {"onnx", "auto"}:
+            backend = self._load_onnx_backend(required=preference == "onnx")
             if backend is not None:
                 return backend
-            LOGGER.warning("Falling back to Hugging Face backend for NLI")
+            if preference == "onnx":
+                LOGGER.warning("Falling back to Hugging Face backend for NLI")
         return self._load_hf_backend()
 
-    def _load_onnx_backend(self):
+    def _load_onnx_backend(self, required: bool = True):
         onnx_path = REPO_ROOT / "backend" / "nli_onnx" / "model.onnx"
+        # "auto" quietly uses PyTorch when no export is present.
+        log_missing = LOGGER.warning if required else LOGGER.debug
         if np is None:
-            LOGGER.warning("NumPy is required for ONNX inference; falling back to Hugging Face backend")
+            log_missing("NumPy is required for ONNX inference; falling back to Hugging Face backend")
             return None
         if not onnx_path.exists():
-            LOGGER.warning("Requested ONNX backend but model not found at %s", onnx_path)
+            log_missing("ONNX NLI model not found at %s", onnx_path)
             return None
         try:
             import onnxruntime as ort  # type: ignore
 
+            available = set(ort.get_available_providers())
+            quantized_path = onnx_path.with_name("model.int8.onnx")
+            # The int8 graph only pays off with int8 dot-product instructions;
+            # older CPUs (and GPUs) run the float32 graph faster.
+            if (
+                quantized_path.exists()
+                and "CUDAExecutionProvider" not in available
+                and _cpu_has_int8_dot()
+            ):
+                onnx_path = quantized_path
             LOGGER.info("Loading NLI model from ONNX: %s", onnx_path)
-            sess = ort.InferenceSession(str(onnx_path))
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = self.num_threads
+            providers = [
+                name
+                for name in ("CUDAExecutionProvider", "CPUExecutionProvider")
+                if name in available
+            ]
+            sess = ort.InferenceSession(str(onnx_path), sess_options=options, providers=providers)
             tokenizer = self._load_tokenizer()
-            return _OnnxBackend(session=sess, tokenizer=tokenizer)
+            return _OnnxBackend(session=sess, tokenizer=tokenizer, model_path=onnx_path)
         except ImportError:
-            LOGGER.warning("onnxruntime not available - falling back to Hugging Face backend")
+            log_missing("onnxruntime not available - falling back to Hugging Face backend")
         except Exception as exc:  # pragma: no cover - defensive
             LOGGER.warning("Failed to load ONNX backend: %s", exc)
         return None
@@ -139,17 +312,130 @@ class NLIScorer:
 
         model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
         model.eval()
-        return _PytorchBackend(tokenizer=tokenizer, model=model)
+        device = detect_device()
+        model.to(device)
+        autocast_dtype = None
+        if device == "cuda":
+            model.half()
+            autocast_dtype = torch.float16
+        elif device == "cpu" and _use_cpu_bf16(str(get_config().get("NLI_CPU_BF16", "auto"))):
+            autocast_dtype = torch.bfloat16
+            model = _ipex_optimize(model)
+        # DeBERTa-v3 and RoBERTa ignore segment ids, so skip building them.
+        use_token_type_ids = getattr(model.config, "type_vocab_size", 0) > 1
+        compiled = False
+        config = get_config()
+        if str(config.get("NLI_COMPILE", "0")) == "1":
+            # Keep generated Inductor kernels between runs so only the first
+            # process pays the full compile cost.
+            os.environ.setdefault(
+                "TORCHINDUCTOR_CACHE_DIR",
+                str(REPO_ROOT / config["DATA_DIR"] / "cache" / "inductor"),
+            )
+            eager = model
+            model = self._compile_model(model)
+            compiled = model is not eager
+        backend = _PytorchBackend(
+            tokenizer=tokenizer,
+            model=model,
+            device=device,
+            autocast_dtype=autocast_dtype,
+            use_token_type_ids=use_token_type_ids,
+        )
+        if compiled:
+            # Trigger compilation now rather than on the first request.
+            backend.score([("warm up", "warm up")])
+        return backend
+
+    @staticmethod
+    def _compile_model(model):
+        if not hasattr(torch, "compile"):
+            LOGGER.warning("torch.compile needs PyTorch 2.0+; using eager NLI model")
+            return model
+        try:
+            # dynamic=True: batches vary in size and padded length, and
+            # recompiling per shape would cost more than it saves.
+            # fullgraph=False lets Dynamo fall back to eager around the few
+            # ops it cannot trace instead of failing the whole model.
+            return torch.compile(model, dynamic=True, fullgraph=False)
+        except Exception as exc:  # pragma: no cover - backend/toolchain specific
+            LOGGER.warning("torch.compile failed, using eager NLI model: %s", exc)
+            return model
 
     def score(self, premise: str, hypothesis: str) -> float:
         result = self.score_batch([(premise, hypothesis)])
         return result[0]
 
+    def _load_cache(self, config) -> Optional[ScoreCache]:
+        if str(config.get("NLI_CACHE", "1")).lower() in {"0", "false", "no", "off"}:
+            return None
+        # The model file, precision, device and truncation length all change
+        # scores, so each combination gets its own namespace.
+        cache_tag = getattr(self.backend, "cache_tag", lambda: type(self.backend).__name__)()
+        namespace = f"{self.model_name}|{cache_tag}|{self.max_seq_length}"
+        with _BACKENDS_LOCK:
+            cache = _CACHES.get(namespace)
+            if cache is None:
+                path = REPO_ROOT / config["DATA_DIR"] / "cache" / "nli_scores.sqlite"
+                maxsize = int(config.get("NLI_CACHE_SIZE", 200_000))
+                cache = _CACHES[namespace] = ScoreCache(namespace, path, maxsize=maxsize)
+        return cache
+
     def score_batch(self, pairs: Iterable[Tuple[str, str]]) -> List[float]:
-        pair_list = list(pairs)
+        pair_list = pairs if isinstance(pairs, list) else list(pairs)
         if not pair_list:
             return []
-        return self.backend.score(pair_list)
+        if self.cache is None:
+            return self._score_uncached(pair_list)
+        keys = [self.cache.key(premise, hypothesis) for premise, hypothesis in pair_list]
+        cached = self.cache.get_many(keys)
+        # First occurrence of each uncached key; duplicates reuse its score.
+        first_seen = {key: index for index, key in reversed(list(enumerate(keys)))}
+        misses = sorted(index for key, index in first_seen.items() if key not in cached)
+        if misses:
+            fresh = self._score_uncached([pair_list[index] for index in misses])
+            new_items = {keys[index]: value for index, value in zip(misses, fresh)}
+            self.cache.put_many(list(new_items.items()))
+            cached.update(new_items)
+        return [cached[key] for key in keys]
+
+    def _score_uncached(self, pair_list: List[Tuple[str, str]]) -> List[float]:
+        # Sorting by length keeps similarly sized pairs together so each padded
+        # batch wastes little attention work on PAD tokens.
+        lengths = [len(premise) + len(hypothesis) for premise, hypothesis in pair_list]
+        order = sorted(range(len(pair_list)), key=lengths.__getitem__)
+        scores: List[float] = [0.0] * len(pair_list)
+        for chunk in self._chunks(order, lengths):
+            for index, value in zip(chunk, self.backend.score([pair_list[i] for i in chunk])):
+                scores[index] = float(value)
+        return scores
+
+    def score_many(self, batches: Sequence[Sequence[Tuple[str, str]]]) -> List[List[float]]:
+        """Score several independent batches together, one result list each.
+
+        Pooling small per-document batches lets :meth:`score_batch` length-sort
+        across all of them and make fewer, fuller tokenizer and model calls.
+        """
+        flat = [pair for batch in batches for pair in batch]
+        scores = self.score_batch(flat)
+        results: List[List[float]] = []
+        offset = 0
+        for batch in batches:
+            results.append(scores[offset : offset + len(batch)])
+            offset += len(batch)
+        return results
+
+    def _chunks(self, order: Sequence[int], lengths: Sequence[int]) -> Iterable[List[int]]:
+        chunk: List[int] = []
+        for index in order:
+            # ``order`` is ascending, so the newest pair sets the padded length.
+            padded_tokens = (len(chunk) + 1) * (lengths[index] // 4 + 1)
+            if chunk and (len(chunk) >= self.batch_size or padded_tokens > self.max_batch_tokens):
+                yield chunk
+                chunk = []
+            chunk.append(index)
+        if chunk:
+            yield chunk
 
 
 __all__ = ["NLIScorer"]
@@ -0,0 +1,96 @@
+"""Persistent cache of NLI contradiction scores.
+
+Scores are deterministic for a given model and ``(premise, hypothesis)`` pair,
+so re-running detection over an unchanged corpus should not reach the model.
+Recent entries live in an in-process LRU; all entries are also written to a
+small SQLite file so other processes and later runs reuse them.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+_LOOKUP_CHUNK = 500
+
+
+class ScoreCache:
+    def __init__(self, namespace: str, path: Optional[Path], maxsize: int = 200_000) -> None:
+        self._namespace = namespace.encode("utf-8") + b"\0"
+        self._maxsize = max(0, maxsize)
+        self._memory: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, score REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as exc:  # pragma: no cover - read-only disks etc.
+                LOGGER.warning("NLI score cache disabled on disk (%s): %s", path, exc)
+                self._conn = None
+
+    def key(self, premise: str, hypothesis: str) -> bytes:
+        digest = hashlib.blake2b(self._namespace, digest_size=16)
+        digest.update(premise.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hypothesis.encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, float]:
+        found: Dict[bytes, float] = {}
+        missing: List[bytes] = []
+        with self._lock:
+            for key in keys:
+                value = self._memory.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+            if self._conn is None or not missing:
+                return found
+            unique = list(dict.fromkeys(missing))
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start : start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                for key, value in self._conn.execute(
+                    f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk
+                ):
+                    found[bytes(key)] = value
+                    self._remember(bytes(key), value)
+        return found
+
+    def put_many(self, items: Sequence[Tuple[bytes, float]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO scores (key, score) VALUES (?, ?)", items
+                    )
+
+    def _remember(self, key: bytes, value: float) -> None:
+        if not self._maxsize:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._maxsize:
+            self._memory.popitem(last=False)
+
+
+__all__ = ["ScoreCache"]
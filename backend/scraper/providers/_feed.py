@@ -0,0 +1,166 @@
+"""Helpers shared by the RSS/Atom feed providers."""
+from __future__ import annotations
+
+import io
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, NamedTuple, Optional
+
+try:  # pragma: no cover - optional C-accelerated HTML/XML parsing
+    import lxml.html as lxml_html
+    from lxml import etree
+    from lxml.etree import ParserError
+except ImportError:  # pragma: no cover - fall back to BeautifulSoup/feedparser
+    lxml_html = None  # type: ignore
+    etree = None  # type: ignore
+    ParserError = ValueError  # type: ignore
+
+from bs4 import BeautifulSoup
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class FeedEntry(NamedTuple):
+    id: str
+    link: str
+    title: str
+    summary: str
+    published: Optional[datetime]
+
+
+def html_to_text(fragment: str) -> str:
+    """Return the visible text of an HTML ``fragment``, text nodes space-joined.
+
+    Uses lxml's C parser when installed; it is roughly 10x faster than
+    BeautifulSoup's pure-Python ``html.parser`` on feed summaries.
+    """
+    if not fragment or not fragment.strip():
+        return ""
+    if lxml_html is not None:
+        try:
+            root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+        except (ParserError, ValueError):
+            return ""
+        return " ".join(root.itertext()).strip()
+    return BeautifulSoup(fragment, "html.parser").get_text(" ").strip()
+
+
+def iter_feed_entries(content: bytes) -> Iterator[FeedEntry]:
+    """Yield the entries of an Atom or RSS 2.0 document.
+
+    With lxml the feed is streamed through ``iterparse`` and only the five
+    fields the providers use are read; each entry element is cleared once
+    handled. Without lxml this falls back to feedparser.
+    """
+    if etree is None:
+        yield from _iter_feedparser_entries(content)
+        return
+    events = etree.iterparse(
+        io.BytesIO(content),
+        events=("end",),
+        tag=(f"{_ATOM}entry", "item"),
+        resolve_entities=False,
+        no_network=True,
+    )
+    yielded = False
+    try:
+        for _, element in events:
+            if element.tag == "item":
+                entry = _rss_entry(element)
+            else:
+                entry = _atom_entry(element)
+            # Drop handled entries so memory stays flat on long feeds.
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            yielded = True
+            yield entry
+    except etree.XMLSyntaxError:
+        # feedparser tolerates malformed feeds; use it unless entries were
+        # already produced from the well-formed prefix.
+        if not yielded:
+            yield from _iter_feedparser_entries(content)
+
+
+def _atom_entry(element) -> FeedEntry:
+    link = ""
+    for node in element.iterfind(f"{_ATOM}link"):
+        if node.get("rel", "alternate") == "alternate":
+            link = node.get("href", "")
+            break
+    node = element.find(f"{_ATOM}summary")
+    if node is None:
+        node = element.find(f"{_ATOM}content")
+    return FeedEntry(
+        id=(element.findtext(f"{_ATOM}id") or link).strip(),
+        link=link.strip(),
+        title=(element.findtext(f"{_ATOM}title") or "").strip(),
+        summary=_node_text(node),
+        published=_parse_iso(element.findtext(f"{_ATOM}published")),
+    )
+
+
+def _rss_entry(element) -> FeedEntry:
+    link = (element.findtext("link") or "").strip()
+    return FeedEntry(
+        id=(element.findtext("guid") or link).strip(),
+        link=link,
+        title=(element.findtext("title") or "").strip(),
+        summary=element.findtext("description") or "",
+        published=_parse_rfc822(element.findtext("pubDate")),
+    )
+
+
+def _node_text(node) -> str:
+    if node is None:
+        return ""
+    if len(node):
+        # type="xhtml" content is inline markup rather than escaped HTML.
+        return etree.tostring(node, method="text", encoding="unicode", with_tail=False)
+    return node.text or ""
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Providers compare against naive ``since`` dates, as feedparser's
+    # ``published_parsed`` (a UTC struct_time) did.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return _naive_utc(datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _parse_rfc822(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return _naive_utc(parsedate_to_datetime(value.strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _iter_feedparser_entries(content: bytes) -> Iterator[FeedEntry]:
+    import feedparser
+
+    for entry in feedparser.parse(content).entries:
+        published = None
+        if getattr(entry, "published_parsed", None):
+            published = datetime(*entry.published_parsed[:6])
+        link = getattr(entry, "link", "")
+        yield FeedEntry(
+            id=getattr(entry, "id", link),
+            link=link,
+            title=getattr(entry, "title", ""),
+            summary=getattr(entry, "summary", ""),
+            published=published,
+        )
+
+
+__all__ = ["FeedEntry", "html_to_text", "iter_feed_entries"]
@@ -5,11 +5,8 @@ import logging
 from datetime import datetime
 from typing import Iterable, List, Optional
 
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-
-from ..base import Provider, ScrapedItem
+from ..base import Provider, ScrapedItem, http_session
+from ._feed import html_to_text, iter_feed_entries
 
 LOGGER = logging.getLogger(__name__)
 FEED_URL = "https://www.gov.uk/government/speeches.atom"
@@ -25,30 +22,25 @@ class GovUkProvider(Provider):
         limit: Optional[int] = None,
     ) -> Iterable[ScrapedItem]:
         try:
-            response = requests.get(FEED_URL, timeout=20)
+            response = http_session().get(FEED_URL, timeout=20)
             response.raise_for_status()
         except Exception as exc:  # pragma: no cover - network dependent
             LOGGER.warning("GOV.UK feed request failed: %s", exc)
             return []
 
-        parsed = feedparser.parse(response.text)
         items: List[ScrapedItem] = []
-        for entry in parsed.entries:
-            published = None
-            if getattr(entry, "published_parsed", None):
-                published = datetime(*entry.published_parsed[:6])
-                if since and published < since:
-                    continue
-            summary = getattr(entry, "summary", "")
-            soup = BeautifulSoup(summary, "html.parser")
-            text = soup.get_text(" ").strip()
+        for entry in iter_feed_entries(response.content):
+            published = entry.published
+            if since and published and published < since:
+                continue
+            text = html_to_text(entry.summary)
             if not text:
-                text = getattr(entry, "title", "").strip()
+                text = entry.title
             try:
                 item = ScrapedItem(
-                    id=getattr(entry, "id", getattr(entry, "link", "")),
-                    url=getattr(entry, "link", ""),
-                    title=getattr(entry, "title", "Untitled"),
+                    id=entry.id,
+                    url=entry.link,
+                    title=entry.title or "Untitled",
                     text=text,
                     source_name="GOV.UK",
                     published_at=published,
@@ -17,49 +17,76 @@ try:  # pragma: no cover - optional dependency
 except Exception:  # pragma: no cover - gracefully degrade
     yt_dlp = None  # type: ignore
 
-try:  # pragma: no cover - optional dependency
-    import yaml
-except Exception:  # pragma: no cover - fallback parser
-    yaml = None  # type: ignore
-
-
 def _parse_upload_date(value: str | None) -> Optional[datetime]:
-    if not value:
+    # yt-dlp always reports YYYYMMDD; slicing skips strptime's format parsing.
+    if not value or len(value) != 8 or not value.isdigit():
         return None
     try:
-        return datetime.strptime(value, "%Y%m%d")
+        return datetime(int(value[:4]), int(value[4:6]), int(value[6:]))
     except ValueError:
         return None
 
 
+def _simple_channel_list(data: str) -> Optional[List[str]]:
+    """Parse the common file shapes without YAML, or return None if unsure.
+
+    Handles a bare list of URLs, optionally ``-`` prefixed and optionally under
+    a single ``channels:`` key, with full-line comments. Anything richer
+    (inline comments, quoting, flow syntax, other keys) goes to PyYAML.
+    """
+    channels: List[str] = []
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line == "channels:":
+            continue
+        if line.startswith("-"):
+            line = line[1:].strip()
+        if (
+            not line
+            or line.startswith(("'", '"', "[", "{", "---"))
+            or ": " in line
+            or " #" in line
+            or line.endswith(":")
+        ):
+            return None
+        channels.append(line)
+    return channels
+
+
 def _load_channels() -> List[str]:
     env_value = os.getenv("YOUTUBE_CHANNELS")
     if env_value:
         return [item.strip() for item in env_value.split(",") if item.strip()]
-    if CHANNELS_FILE.exists():
-        data = CHANNELS_FILE.read_text(encoding="utf-8")
-        if yaml:
-            try:
-                parsed = yaml.safe_load(data)
-                if isinstance(parsed, dict):
-                    if "channels" in parsed and isinstance(parsed["channels"], list):
-                        return [str(item) for item in parsed["channels"] if str(item).strip()]
-                elif isinstance(parsed, list):
-                    return [str(item) for item in parsed if str(item).strip()]
-            except Exception as exc:
-                LOGGER.warning("Unable to parse %s: %s", CHANNELS_FILE, exc)
-        # fallback: treat as newline separated list ignoring comments
-        channels: List[str] = []
-        for line in data.splitlines():
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if line.startswith("-"):
-                line = line.lstrip("- ")
-            channels.append(line)
-        if channels:
-            return channels
-    return []
+    if not CHANNELS_FILE.exists():
+        return []
+    data = CHANNELS_FILE.read_text(encoding="utf-8")
+    simple = _simple_channel_list(data)
+    if simple is not None:
+        return simple
+    try:  # pragma: no cover - optional dependency, imported only when needed
+        import yaml
+    except Exception:  # pragma: no cover
+        yaml = None  # type: ignore
+    if yaml:
+        try:
+            parsed = yaml.safe_load(data)
+            if isinstance(parsed, dict):
+                if "channels" in parsed and isinstance(parsed["channels"], list):
+                    return [str(item) for item in parsed["channels"] if str(item).strip()]
+            elif isinstance(parsed, list):
+                return [str(item) for item in parsed if str(item).strip()]
+        except Exception as exc:
+            LOGGER.warning("Unable to parse %s: %s", CHANNELS_FILE, exc)
+    # fallback: treat as newline separated list ignoring comments
+    channels: List[str] = []
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("-"):
+            line = line.lstrip("- ")
+        channels.append(line)
+    return channels
 
 
 class YouTubeProvider(Provider):
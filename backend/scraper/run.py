@@ -3,11 +3,12 @@ from __future__ import annotations
 
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable, List
 
-from .base import Provider
+from .base import Provider, ScrapedItem
 from .storage import RawItemStore
 from .providers import PROVIDERS
 
@@ -40,18 +41,30 @@ def run_scraper(
     limit: int | None,
     out_path: Path,
 ) -> dict:
-    summary: dict[str, dict[str, int]] = {}
-    with RawItemStore(out_path) as store:
-        for provider in providers:
-            LOGGER.info("Fetching from provider %s", provider.slug)
-            items = list(provider.fetch(since=since, limit=limit))
+    counts: dict[str, dict[str, int]] = {}
+    if not providers:
+        return counts
+    with RawItemStore(out_path) as store, ThreadPoolExecutor(
+        max_workers=len(providers)
+    ) as pool:
+        # Providers are network bound and independent, so they fetch in
+        # parallel; the SQLite store is only touched from this thread.
+        futures = {pool.submit(_fetch_all, provider, since, limit): provider for provider in providers}
+        for future in as_completed(futures):
+            provider = futures[future]
+            items = future.result()
             inserted, updated = store.upsert_items(items)
-            summary[provider.slug] = {
+            counts[provider.slug] = {
                 "fetched": len(items),
                 "inserted": inserted,
                 "updated": updated,
             }
-    return summary
+    return {provider.slug: counts[provider.slug] for provider in providers}
+
+
+def _fetch_all(provider: Provider, since: datetime | None, limit: int | None) -> List[ScrapedItem]:
+    LOGGER.info("Fetching from provider %s", provider.slug)
+    return list(provider.fetch(since=since, limit=limit))
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -2,11 +2,11 @@
 from __future__ import annotations
 
 import datetime as dt
-import json
 import sqlite3
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, List, Set, Tuple
 
+from .. import _json
 from .base import ScrapedItem
 
 
@@ -28,6 +28,43 @@ CREATE TABLE IF NOT EXISTS raw_items (
 """
 
 
+_UPSERT_SQL = """
+INSERT INTO raw_items (
+    url, item_id, title, text, source_name, published_at, author,
+    media_urls_json, raw_html, license, extra_json, fetched_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    item_id = excluded.item_id,
+    title = excluded.title,
+    text = excluded.text,
+    source_name = excluded.source_name,
+    published_at = excluded.published_at,
+    author = excluded.author,
+    media_urls_json = excluded.media_urls_json,
+    raw_html = excluded.raw_html,
+    license = excluded.license,
+    extra_json = excluded.extra_json,
+    fetched_at = excluded.fetched_at
+"""
+
+# Newest-first scans for all_items; url breaks ties because every row from
+# one upsert batch shares the same fetched_at.
+_FETCHED_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_raw_items_fetched_at
+ON raw_items (fetched_at DESC, url DESC)
+"""
+
+_ITEM_COLUMNS = (
+    "url, item_id, title, text, source_name, published_at, author,"
+    " media_urls_json, license, extra_json, fetched_at"
+)
+
+_PAGE_SIZE = 1000
+
+# Stays well under SQLite's bound-parameter limit on old builds (999).
+_LOOKUP_CHUNK = 500
+
+
 class RawItemStore:
     """Lightweight wrapper around SQLite for scraped items."""
 
@@ -36,85 +73,104 @@ class RawItemStore:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = sqlite3.connect(self.path)
         self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
         self.conn.row_factory = sqlite3.Row
         self._ensure_schema()
 
     def _ensure_schema(self) -> None:
         self.conn.execute(_SCHEMA_SQL)
+        self.conn.execute(_FETCHED_INDEX_SQL)
         self.conn.commit()
 
     def upsert_items(self, items: Iterable[ScrapedItem]) -> Tuple[int, int]:
-        inserted = 0
+        fetched_at = dt.datetime.now(dt.timezone.utc).isoformat()
+        rows = [
+            (
+                str(item.url),
+                item.id,
+                item.title,
+                item.text,
+                item.source_name,
+                item.published_at.isoformat() if item.published_at else None,
+                item.author,
+                _json.dumps([str(url) for url in item.media_urls]),
+                item.raw_html,
+                item.license,
+                _json.dumps(item.extra or {}),
+                fetched_at,
+            )
+            for item in items
+        ]
+        # One lookup for the whole batch tells inserts from updates; a URL
+        # repeated within the batch counts as an update after its first row.
+        seen = self._existing_urls([row[0] for row in rows])
         updated = 0
-        for item in items:
-            payload = {
-                "url": str(item.url),
-                "item_id": item.id,
-                "title": item.title,
-                "text": item.text,
-                "source_name": item.source_name,
-                "published_at": item.published_at.isoformat() if item.published_at else None,
-                "author": item.author,
-                "media_urls_json": json.dumps([str(url) for url in item.media_urls]),
-                "raw_html": item.raw_html,
-                "license": item.license,
-                "extra_json": json.dumps(item.extra or {}),
-                "fetched_at": dt.datetime.now(dt.timezone.utc).isoformat(),
-            }
-            existing = self.conn.execute(
-                "SELECT url FROM raw_items WHERE url = ?", (payload["url"],)
-            ).fetchone()
-            if existing:
-                self.conn.execute(
-                    """
-                    UPDATE raw_items
-                    SET item_id = :item_id,
-                        title = :title,
-                        text = :text,
-                        source_name = :source_name,
-                        published_at = :published_at,
-                        author = :author,
-                        media_urls_json = :media_urls_json,
-                        raw_html = :raw_html,
-                        license = :license,
-                        extra_json = :extra_json,
-                        fetched_at = :fetched_at
-                    WHERE url = :url
-                    """,
-                    payload,
-                )
+        for row in rows:
+            if row[0] in seen:
                 updated += 1
             else:
-                self.conn.execute(
-                    """
-                    INSERT INTO raw_items (
-                        url, item_id, title, text, source_name, published_at, author,
-                        media_urls_json, raw_html, license, extra_json, fetched_at
-                    ) VALUES (:url, :item_id, :title, :text, :source_name, :published_at, :author,
-                              :media_urls_json, :raw_html, :license, :extra_json, :fetched_at)
-                    """,
-                    payload,
-                )
-                inserted += 1
-        self.conn.commit()
-        return inserted, updated
+                seen.add(row[0])
+        with self.conn:
+            self.conn.executemany(_UPSERT_SQL, rows)
+        return len(rows) - updated, updated
 
-    def all_items(self) -> Iterable[ScrapedItem]:
-        rows = self.conn.execute("SELECT * FROM raw_items ORDER BY fetched_at DESC")
-        for row in rows:
-            yield ScrapedItem(
-                id=row["item_id"] or row["url"],
-                url=row["url"],
-                title=row["title"],
-                text=row["text"],
-                source_name=row["source_name"],
-                published_at=dt.datetime.fromisoformat(row["published_at"]) if row["published_at"] else None,
-                author=row["author"],
-                media_urls=json.loads(row["media_urls_json"] or "[]"),
-                raw_html=row["raw_html"],
-                license=row["license"],
-                extra=json.loads(row["extra_json"] or "{}"),
+    def _existing_urls(self, urls: List[str]) -> Set[str]:
+        existing: Set[str] = set()
+        unique = list(dict.fromkeys(urls))
+        for start in range(0, len(unique), _LOOKUP_CHUNK):
+            chunk = unique[start : start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" for _ in chunk)
+            existing.update(
+                row[0]
+                for row in self.conn.execute(
+                    f"SELECT url FROM raw_items WHERE url IN ({placeholders})", chunk
+                )
             )
+        return existing
+
+    def all_items(
+        self, *, include_html: bool = True, page_size: int = _PAGE_SIZE
+    ) -> Iterable[ScrapedItem]:
+        """Yield stored items newest first, reading ``page_size`` rows at a time.
+
+        Pages are fetched with a ``(fetched_at, url)`` seek cursor so memory
+        stays bounded however large the table grows. ``raw_html`` is usually
+        the largest column; pass ``include_html=False`` to leave it unread.
+        """
+        columns = _ITEM_COLUMNS + (", raw_html" if include_html else "")
+        first_page = f"SELECT {columns} FROM raw_items ORDER BY fetched_at DESC, url DESC LIMIT ?"
+        next_page = (
+            f"SELECT {columns} FROM raw_items WHERE (fetched_at, url) < (?, ?)"
+            " ORDER BY fetched_at DESC, url DESC LIMIT ?"
+        )
+        page_size = max(1, page_size)
+        rows = self.conn.execute(first_page, (page_size,)).fetchall()
+        while rows:
+            for row in rows:
+                yield self._row_to_item(row, include_html)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+            rows = self.conn.execute(
+                next_page, (last["fetched_at"], last["url"], page_size)
+            ).fetchall()
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row, include_html: bool) -> ScrapedItem:
+        return ScrapedItem(
+            id=row["item_id"] or row["url"],
+            url=row["url"],
+            title=row["title"],
+            text=row["text"],
+            source_name=row["source_name"],
+            published_at=dt.datetime.fromisoformat(row["published_at"]) if row["published_at"] else None,
+            author=row["author"],
+            media_urls=_json.loads(row["media_urls_json"] or "[]"),
+            raw_html=row["raw_html"] if include_html else None,
+            license=row["license"],
+            extra=_json.loads(row["extra_json"] or "{}"),
+        )
 
     def close(self) -> None:
         self.conn.close()
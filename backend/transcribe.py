@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import logging
+import os
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from fastapi import HTTPException
 
-from .config import REPO_ROOT, ensure_dirs
+from ._models import detect_device
+from .config import REPO_ROOT, ensure_dirs, get_config
 
 LOGGER = logging.getLogger(__name__)
 
@@ -20,26 +23,96 @@ except Exception:  # pragma: no cover - optional dependency
     WhisperModel = None  # type: ignore
     _FAST_WHISPER_AVAILABLE = False
 
+try:  # pragma: no cover - faster-whisper >= 1.1
+    from faster_whisper import BatchedInferencePipeline  # type: ignore
+except Exception:  # pragma: no cover - older faster-whisper or not installed
+    BatchedInferencePipeline = None  # type: ignore
+
+# The distilled large checkpoint matches large-v3 accuracy at a fraction of
+# its decode cost, but on CPU it is still several times slower than "base".
+_GPU_MODEL = "distil-large-v3"
+_CPU_MODEL = "base"
+_BATCH_SIZE = 16
+_CHUNK_SECONDS = 30
+
+_MODELS: Dict[Tuple[str, str, str], object] = {}
+_MODELS_LOCK = threading.Lock()
+
 
 class TranscriptionDependencyError(RuntimeError):
     pass
 
 
 def _format_timestamp(seconds: float) -> str:
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
-
-
-def _write_vtt(segments: List[Dict[str, float | str]], transcript_path: Path) -> None:
-    with transcript_path.open("w", encoding="utf-8") as handle:
-        handle.write("WEBVTT\n\n")
-        for index, segment in enumerate(segments, start=1):
-            start = _format_timestamp(float(segment["start"]))
-            end = _format_timestamp(float(segment["end"]))
-            text = str(segment["text"]).strip()
-            handle.write(f"{index}\n{start} --> {end}\n{text}\n\n")
+    # Integer milliseconds: rounding once up front also avoids "00:00:60.000"
+    # when a float just below a minute boundary rounds up in formatting.
+    millis = max(0, round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def _write_vtt(segments: Iterable[Dict[str, float | str]], transcript_path: Path) -> None:
+    """Write ``segments`` as WebVTT, one cue at a time as they arrive.
+
+    Cues go to a temporary file that replaces ``transcript_path`` only once
+    the iterator is exhausted, so a failed decode never leaves half a
+    transcript behind; the temporary file is removed on failure too.
+    """
+    tmp_path = transcript_path.with_suffix(transcript_path.suffix + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", buffering=1 << 20) as handle:
+            handle.write("WEBVTT\n\n")
+            for index, segment in enumerate(segments, start=1):
+                start = _format_timestamp(float(segment["start"]))
+                end = _format_timestamp(float(segment["end"]))
+                text = str(segment["text"]).strip()
+                handle.write(f"{index}\n{start} --> {end}\n{text}\n\n")
+        os.replace(tmp_path, transcript_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _whisper_device() -> str:
+    # CTranslate2 only runs on CUDA or CPU; MPS hosts use the CPU path.
+    return "cuda" if detect_device() == "cuda" else "cpu"
+
+
+def _compute_type(device: str) -> str:
+    configured = str(get_config().get("WHISPER_COMPUTE_TYPE") or "").strip()
+    if configured:
+        return configured
+    # int8 weights cut memory traffic 4x and use VNNI dot products on CPU.
+    return "int8_float16" if device == "cuda" else "int8"
+
+
+def _get_model(name: str, device: str, compute_type: str):
+    """Return the shared Whisper model for ``(name, device, compute_type)``.
+
+    Loading reads hundreds of MB of weights, so it happens once per process;
+    the lock stops concurrent first requests from loading it twice.
+    """
+    key = (name, device, compute_type)
+    with _MODELS_LOCK:
+        model = _MODELS.get(key)
+        if model is None:
+            model = _MODELS[key] = _load_model(name, device, compute_type)
+    return model
+
+
+def _load_model(name: str, device: str, compute_type: str):
+    LOGGER.info("Loading Whisper model %s on %s (%s)", name, device, compute_type)
+    model = WhisperModel(
+        name,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=os.cpu_count() or 0,
+    )
+    if BatchedInferencePipeline is not None:
+        return BatchedInferencePipeline(model=model)
+    return model
 
 
 def transcribe_audio(path: str) -> List[Dict[str, float | str]]:
@@ -54,26 +127,43 @@ def transcribe_audio(path: str) -> List[Dict[str, float | str]]:
         print(msg, file=sys.stderr)
         raise HTTPException(status_code=400, detail=msg)
 
-    model = WhisperModel("base", device="cpu")
-    segments_iter, _ = model.transcribe(str(audio_path), beam_size=5, vad_filter=True)
+    device = _whisper_device()
+    name = str(get_config().get("WHISPER_MODEL") or (_GPU_MODEL if device == "cuda" else _CPU_MODEL))
+    model = _get_model(name, device, _compute_type(device))
+    options = {
+        "beam_size": 1,
+        "vad_filter": True,
+        # Split on half-second pauses into chunks of at most 30s, Whisper's
+        # native window, so each chunk decodes independently.
+        "vad_parameters": {"min_silence_duration_ms": 500},
+        "chunk_length": _CHUNK_SECONDS,
+    }
+    if BatchedInferencePipeline is not None:
+        # VAD-split chunks are decoded together instead of one after another.
+        options["batch_size"] = _BATCH_SIZE
+    segments_iter, _ = model.transcribe(str(audio_path), **options)
+
+    config = ensure_dirs()
+    data_dir = REPO_ROOT / config["DATA_DIR"]
+    transcripts_dir = data_dir / "transcripts"
+    transcripts_dir.mkdir(parents=True, exist_ok=True)
+    transcript_path = transcripts_dir / f"{audio_path.stem}.vtt"
 
+    # Segments are decoded lazily; write each cue as soon as it is produced
+    # rather than collecting everything and walking the list a second time.
     segments: List[Dict[str, float | str]] = []
-    for segment in segments_iter:
-        segments.append(
-            {
+
+    def _collect() -> Iterator[Dict[str, float | str]]:
+        for segment in segments_iter:
+            item = {
                 "text": segment.text.strip(),
                 "start": float(segment.start),
                 "end": float(segment.end),
             }
-        )
+            segments.append(item)
+            yield item
 
-    config = ensure_dirs()
-    data_dir = REPO_ROOT / config["DATA_DIR"]
-    transcripts_dir = data_dir / "transcripts"
-    transcripts_dir.mkdir(parents=True, exist_ok=True)
-
-    transcript_path = transcripts_dir / f"{audio_path.stem}.vtt"
-    _write_vtt(segments, transcript_path)
+    _write_vtt(_collect(), transcript_path)
     LOGGER.info("Saved transcript to %s", transcript_path)
     return segments
 
@@ -7,10 +7,24 @@ Provides functions to store scraped content in SQLite database.
 import sqlite3
 import json
 import os
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_meta(meta: dict) -> str:
+    """Serialize segment metadata to JSON text (orjson when installed)."""
+    if orjson is not None:
+        # Decode so SQLite stores TEXT, not a BLOB, in meta_json
+        return orjson.dumps(meta, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(meta)
+
+
 # Import from parent if available, otherwise use local definitions
 try:
     from backend.db import get_db_connection, DATA_DIR
@@ -26,6 +40,17 @@ except ImportError:
 
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
+        # WAL + NORMAL sync: one fsync per checkpoint instead of per commit.
+        # A power loss can drop the last few commits but never corrupts the
+        # file; scraped content can simply be fetched again.
+        conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-65536;"
+            "PRAGMA mmap_size=268435456;"
+            "PRAGMA busy_timeout=5000;"
+        )
         return conn
 
 
@@ -55,11 +80,23 @@ def init_db(conn: sqlite3.Connection):
             ts_end REAL,
             meta_json TEXT,
             embedding BLOB,
+            embedding_row INTEGER,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (source_id) REFERENCES sources(id)
         )
     """)
 
+    # Databases created before the on-disk embedding matrix lack the column
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(segments)")}
+    if 'embedding_row' not in columns:
+        cursor.execute("ALTER TABLE segments ADD COLUMN embedding_row INTEGER")
+
+    # Search maps top-k matrix rows back to segments through this column
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_segments_embedding_row
+        ON segments(embedding_row)
+    """)
+
     # Create index on source_id for faster lookups
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_segments_source_id 
@@ -68,6 +105,13 @@ def init_db(conn: sqlite3.Connection):
 
     conn.commit()
 
+    # Embeddings stored before the matrix existed are added to it once
+    if get_embeddings_missing_rows(conn, 1):
+        from .embeddings import EmbeddingMatrix, backfill_matrix
+        matrix = EmbeddingMatrix.for_connection(conn)
+        if matrix is not None:
+            backfill_matrix(conn, matrix)
+
 
 def insert_source(
     conn: sqlite3.Connection,
@@ -121,27 +165,30 @@ def insert_segments(
     Returns:
         List of segment IDs
     """
-    cursor = conn.cursor()
-    segment_ids = []
-
-    for segment in segments:
-        meta_json_str = json.dumps(segment.meta_json) if segment.meta_json else None
-
-        cursor.execute("""
-            INSERT INTO segments (source_id, text, ts_start, ts_end, meta_json)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
+    rows = [
+        (
             source_id,
             segment.text,
             segment.ts_start,
             segment.ts_end,
-            meta_json_str,
-        ))
+            _dumps_meta(segment.meta_json) if segment.meta_json else None,
+        )
+        for segment in segments
+    ]
+    if not rows:
+        return []
+
+    # One transaction and one prepared statement for the whole batch.
+    with conn:
+        conn.executemany("""
+            INSERT INTO segments (source_id, text, ts_start, ts_end, meta_json)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        # The write lock is held until commit, so AUTOINCREMENT handed this
+        # batch a contiguous id range ending at the last inserted rowid.
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
 
-        segment_ids.append(cursor.lastrowid)
-
-    conn.commit()
-    return segment_ids
+    return list(range(last_id - len(rows) + 1, last_id + 1))
 
 
 def save_raw_text(source_id: int, text: str, data_dir: Optional[str] = None):
@@ -164,6 +211,9 @@ def get_segments_without_embeddings(
 ) -> List[dict]:
     """Get segments that need embeddings."""
     cursor = conn.cursor()
+    # Plain tuples are much cheaper to build than sqlite3.Row for a scan
+    # that can cover the whole table
+    cursor.row_factory = None
 
     query = """
         SELECT id, text
@@ -171,11 +221,13 @@ def get_segments_without_embeddings(
         WHERE embedding IS NULL
     """
 
+    params = ()
     if limit:
-        query += f" LIMIT {limit}"
+        query += " LIMIT ?"
+        params = (int(limit),)
 
-    cursor.execute(query)
-    return [dict(row) for row in cursor.fetchall()]
+    cursor.execute(query, params)
+    return [{'id': row[0], 'text': row[1]} for row in cursor]
 
 
 def update_segment_embedding(
@@ -190,3 +242,79 @@ def update_segment_embedding(
         (embedding, segment_id)
     )
     conn.commit()
+
+
+def update_segment_embeddings(
+    conn: sqlite3.Connection,
+    pairs: Iterable[Tuple[bytes, int]],
+    first_row: Optional[int] = None,
+):
+    """Update many segments' embeddings in a single transaction.
+
+    Args:
+        pairs: ``(embedding, segment_id)`` tuples
+        first_row: Row of the first pair in the on-disk embedding matrix;
+            later pairs occupy the following rows
+    """
+    with conn:
+        if first_row is None:
+            conn.executemany(
+                "UPDATE segments SET embedding = ? WHERE id = ?",
+                pairs,
+            )
+        else:
+            conn.executemany(
+                "UPDATE segments SET embedding = ?, embedding_row = ? WHERE id = ?",
+                (
+                    (embedding, first_row + offset, segment_id)
+                    for offset, (embedding, segment_id) in enumerate(pairs)
+                ),
+            )
+
+
+def get_segments_by_embedding_rows(
+    conn: sqlite3.Connection,
+    rows: List[int],
+) -> dict:
+    """Map embedding-matrix rows to ``{row: {id, text, source_id}}``."""
+    found = {}
+    for start in range(0, len(rows), 500):
+        chunk = rows[start:start + 500]
+        placeholders = ','.join('?' for _ in chunk)
+        cursor = conn.execute(
+            f"SELECT embedding_row, id, text, source_id FROM segments "
+            f"WHERE embedding_row IN ({placeholders})",
+            chunk,
+        )
+        for row in cursor:
+            found[row[0]] = {'id': row[1], 'text': row[2], 'source_id': row[3]}
+    return found
+
+
+def get_embeddings_missing_rows(
+    conn: sqlite3.Connection,
+    limit: int = 1024,
+) -> List[Tuple[int, bytes]]:
+    """Get embedded segments not yet in the on-disk embedding matrix."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute("""
+        SELECT id, embedding
+        FROM segments
+        WHERE embedding_row IS NULL AND embedding IS NOT NULL
+        ORDER BY id
+        LIMIT ?
+    """, (int(limit),))
+    return cursor.fetchall()
+
+
+def set_embedding_rows(
+    conn: sqlite3.Connection,
+    pairs: Iterable[Tuple[int, int]],
+):
+    """Record ``(embedding_row, segment_id)`` pairs in one transaction."""
+    with conn:
+        conn.executemany(
+            "UPDATE segments SET embedding_row = ? WHERE id = ?",
+            pairs,
+        )
@@ -1,16 +1,38 @@
 """
 Embedding functionality for segments.
 
-Uses sentence-transformers to generate embeddings for text segments.
+Uses sentence-transformers to generate embeddings for text segments, or an
+int8-quantized ONNX export of the same model when EMBED_ONNX=1 (requires
+optimum). The int8 vectors differ slightly from the float ones, so a
+database should stick to one encoder; switching means re-embedding.
 """
 
 import logging
+import os
+import struct
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 import sqlite3
 
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# One lock per matrix file, shared by every EmbeddingMatrix for that path
+_MATRIX_LOCKS: dict = {}
+_MATRIX_LOCKS_GUARD = threading.Lock()
+
+
+def _matrix_lock(path: str) -> threading.Lock:
+    key = os.path.abspath(path)
+    with _MATRIX_LOCKS_GUARD:
+        return _MATRIX_LOCKS.setdefault(key, threading.Lock())
+
 # Try to import sentence-transformers
 try:
     from sentence_transformers import SentenceTransformer
@@ -22,28 +44,118 @@ except ImportError:
         "Run: pip install sentence-transformers"
     )
 
+# Optional ONNX Runtime path: fused kernels plus int8 matmuls on CPU
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 # Default model - same as commonly used in embedding applications
 DEFAULT_MODEL = 'all-MiniLM-L6-v2'
 
+# sentence-transformers truncates all-MiniLM-L6-v2 inputs at 256 tokens
+ONNX_MAX_LENGTH = 256
+ONNX_BATCH_SIZE = 32
+
+
+class OnnxEncoder:
+    """ONNX Runtime stand-in for ``SentenceTransformer.encode``.
+
+    The model is exported and dynamically quantized to int8 once, then
+    loaded from ``cache_dir`` on later runs. Pooling matches the
+    sentence-transformers checkpoint: attention-masked mean, then L2 norm.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str):
+        repo_id = model_name if '/' in model_name else f'sentence-transformers/{model_name}'
+        export_dir = os.path.join(cache_dir, repo_id.replace('/', '__'))
+        quantized_file = 'model_quantized.onnx'
+
+        if not os.path.exists(os.path.join(export_dir, quantized_file)):
+            logger.info(f"Exporting {repo_id} to int8 ONNX in {export_dir}")
+            model = ORTModelForFeatureExtraction.from_pretrained(repo_id, export=True)
+            model.save_pretrained(export_dir)
+            AutoTokenizer.from_pretrained(repo_id).save_pretrained(export_dir)
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=export_dir,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False),
+            )
+
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(export_dir, file_name=quantized_file)
+
+    def encode(
+        self,
+        texts: List[str],
+        normalize_embeddings: bool = True,
+        batch_size: int = ONNX_BATCH_SIZE,
+        **kwargs,
+    ) -> np.ndarray:
+        # Length-sort so each batch pads to a similar length, then restore order
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[idx] for idx in order[start:start + batch_size]]
+            inputs = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=ONNX_MAX_LENGTH,
+                return_tensors='np',
+            )
+            hidden = np.asarray(self.model(**inputs).last_hidden_state, dtype=np.float32)
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            chunks.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        pooled = np.concatenate(chunks) if chunks else np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(pooled):
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+        embeddings = np.empty_like(pooled)
+        embeddings[order] = pooled
+        return embeddings
+
+
+def _onnx_requested() -> bool:
+    """ONNX is opt-in: mixing its vectors with float ones skews similarity."""
+    return os.environ.get('EMBED_ONNX', '0') != '0'
+
 
 class EmbeddingGenerator:
     """Generate embeddings for text segments."""
 
-    def __init__(self, model_name: str = DEFAULT_MODEL):
-        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+    def __init__(self, model_name: str = DEFAULT_MODEL, use_onnx: Optional[bool] = None):
+        if use_onnx is None:
+            use_onnx = _onnx_requested()
+        if use_onnx and not ONNX_AVAILABLE:
+            raise ImportError(
+                "optimum[onnxruntime] is required for ONNX embeddings. "
+                "Install with: pip install optimum[onnxruntime]"
+            )
+        if not use_onnx and not SENTENCE_TRANSFORMERS_AVAILABLE:
             raise ImportError(
                 "sentence-transformers is required. "
                 "Install with: pip install sentence-transformers"
             )
 
         self.model_name = model_name
+        self.use_onnx = use_onnx
         self.model = None
 
     def _load_model(self):
         """Lazy load the model."""
         if self.model is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            if self.use_onnx:
+                from .db import DATA_DIR
+                logger.info(f"Loading int8 ONNX embedding model: {self.model_name}")
+                self.model = OnnxEncoder(self.model_name, os.path.join(DATA_DIR, 'onnx'))
+            else:
+                logger.info(f"Loading embedding model: {self.model_name}")
+                self.model = SentenceTransformer(self.model_name)
 
     def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
@@ -71,10 +183,237 @@ class EmbeddingGenerator:
         return self.embed_texts([text])[0]
 
 
+class EmbeddingMatrix:
+    """Append-only float32 matrix of segment embeddings on disk.
+
+    Rows are appended as batches are embedded and ``segments.embedding_row``
+    records each segment's row, so a search memory-maps the whole ``(N, D)``
+    matrix and scores it with one matrix-vector product instead of reading
+    and decoding a BLOB per row. A 16-byte header records the dimension.
+
+    Row numbers only mean something to one database, so the matrix lives
+    beside the database file (see ``for_connection``).
+    """
+
+    HEADER = struct.Struct('<8sI4x')
+    MAGIC = b'SEGEMB01'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = _matrix_lock(path)
+
+    @classmethod
+    def for_connection(cls, conn: sqlite3.Connection) -> Optional['EmbeddingMatrix']:
+        """Return the matrix belonging to ``conn``'s database file.
+
+        In-memory databases have no file to sit beside and get None.
+        """
+        row = conn.execute("PRAGMA database_list").fetchone()
+        db_path = row[2] if row else ""
+        if not db_path:
+            return None
+        return cls(db_path + '.embeddings.f32')
+
+    def dim(self) -> Optional[int]:
+        """Embedding width, or None before the first append."""
+        return self._read_dim()
+
+    def _read_dim(self) -> Optional[int]:
+        try:
+            with open(self.path, 'rb') as fh:
+                header = fh.read(self.HEADER.size)
+        except FileNotFoundError:
+            return None
+        if len(header) < self.HEADER.size:
+            return None
+        magic, dim = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.path} is not an embedding matrix")
+        return dim
+
+    def append(self, rows: np.ndarray) -> int:
+        """Append ``rows`` and return the matrix row of the first one.
+
+        The row count is read and the rows written under a lock shared by
+        every instance for this path, plus an OS file lock, so concurrent
+        writers (threads or processes) never get overlapping row numbers.
+        """
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        dim = rows.shape[1]
+        row_bytes = dim * rows.itemsize
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock, open(self.path, 'ab+') as fh:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            fh.seek(0)
+            header = fh.read(self.HEADER.size)
+            if len(header) < self.HEADER.size:
+                # New file, or a header torn by an interrupted first append
+                fh.truncate(0)
+                fh.write(self.HEADER.pack(self.MAGIC, dim))
+            else:
+                magic, existing = self.HEADER.unpack(header)
+                if magic != self.MAGIC:
+                    raise ValueError(f"{self.path} is not an embedding matrix")
+                if existing != dim:
+                    raise ValueError(
+                        f"Embedding dimension {dim} does not match {self.path} ({existing})"
+                    )
+            fh.flush()
+
+            # Drop a torn row left by an interrupted append
+            body = os.fstat(fh.fileno()).st_size - self.HEADER.size
+            start, torn = divmod(body, row_bytes)
+            if torn:
+                fh.truncate(self.HEADER.size + start * row_bytes)
+
+            # Append mode writes at the end regardless of the read position
+            fh.write(rows.tobytes())
+            fh.flush()
+        return start
+
+    def load(self) -> np.ndarray:
+        """Memory-map the matrix read-only; empty if nothing is stored yet."""
+        dim = self._read_dim()
+        if dim is None:
+            return np.empty((0, 0), dtype=np.float32)
+        count = (os.path.getsize(self.path) - self.HEADER.size) // (dim * 4)
+        if count == 0:
+            return np.empty((0, dim), dtype=np.float32)
+        return np.memmap(
+            self.path, dtype=np.float32, mode='r',
+            offset=self.HEADER.size, shape=(count, dim),
+        )
+
+
+def backfill_matrix(
+    conn: sqlite3.Connection,
+    matrix: EmbeddingMatrix,
+    chunk_size: int = 1024,
+):
+    """Append BLOB embeddings stored before the matrix existed.
+
+    Such segments have an ``embedding`` but no ``embedding_row`` and would
+    otherwise never be searched. Run from ``init_db`` and ``embed_segments``;
+    once they are appended this is a no-op.
+    """
+    from .db import get_embeddings_missing_rows, set_embedding_rows
+
+    total = 0
+    while True:
+        rows = get_embeddings_missing_rows(conn, chunk_size)
+        if not rows:
+            break
+        dim = matrix.dim() or len(rows[0][1]) // 4
+        usable = [(seg_id, blob) for seg_id, blob in rows if len(blob) == dim * 4]
+        if len(usable) < len(rows):
+            # Row -1 matches nothing in the matrix and stops them being revisited
+            logger.warning(
+                f"Skipping {len(rows) - len(usable)} embeddings that do not "
+                f"match the {dim}-dimensional matrix"
+            )
+            set_embedding_rows(conn, [
+                (-1, seg_id) for seg_id, blob in rows if len(blob) != dim * 4
+            ])
+        if not usable:
+            continue
+        vectors = np.frombuffer(b''.join(blob for _, blob in usable), dtype=np.float32)
+        first_row = matrix.append(vectors.reshape(len(usable), dim))
+        set_embedding_rows(conn, [
+            (first_row + offset, seg_id) for offset, (seg_id, _) in enumerate(usable)
+        ])
+        total += len(usable)
+
+    if total:
+        logger.info(f"Added {total} existing embeddings to {matrix.path}")
+
+
+def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+    k = min(top_k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def _search_blobs(conn: sqlite3.Connection, query: np.ndarray, top_k: int) -> List[dict]:
+    """Score BLOBs directly; used for in-memory databases, which have no matrix."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = [
+        row for row in cursor.execute(
+            "SELECT id, text, source_id, embedding FROM segments WHERE embedding IS NOT NULL"
+        )
+        if len(row[3]) == query.nbytes
+    ]
+    if not rows:
+        return []
+    embeddings = np.frombuffer(b''.join(row[3] for row in rows), dtype=np.float32)
+    scores = embeddings.reshape(len(rows), -1) @ query
+    return [
+        {'id': rows[i][0], 'text': rows[i][1], 'source_id': rows[i][2], 'score': float(scores[i])}
+        for i in _top_k(scores, top_k)
+    ]
+
+
+def search_segments(
+    conn: sqlite3.Connection,
+    query_embedding: np.ndarray,
+    top_k: int = 10,
+    matrix: Optional[EmbeddingMatrix] = None,
+) -> List[dict]:
+    """
+    Find the segments most similar to a normalized query embedding.
+
+    Returns:
+        Dicts with id, text, source_id and score, best first
+    """
+    from .db import get_segments_by_embedding_rows
+
+    if top_k <= 0:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+
+    matrix = matrix or EmbeddingMatrix.for_connection(conn)
+    if matrix is None:
+        return _search_blobs(conn, query, top_k)
+
+    embeddings = matrix.load()
+    if not len(embeddings):
+        return []
+
+    # Embeddings are L2-normalized, so the dot product is cosine similarity
+    scores = embeddings @ query
+    best = _top_k(scores, top_k)
+
+    # Rows orphaned by re-embedding or an interrupted run have no segment
+    segments = get_segments_by_embedding_rows(conn, [int(row) for row in best])
+    results = []
+    for row in best:
+        segment = segments.get(int(row))
+        if segment is not None:
+            results.append({**segment, 'score': float(scores[row])})
+    return results
+
+
+def _writer_connection(conn: sqlite3.Connection) -> Optional[sqlite3.Connection]:
+    """Open a second connection to ``conn``'s database for background writes.
+
+    Returns None for in-memory databases, which another connection cannot
+    see; callers then write on ``conn`` directly.
+    """
+    row = conn.execute("PRAGMA database_list").fetchone()
+    path = row[2] if row else ""
+    if not path:
+        return None
+    writer = sqlite3.connect(path, check_same_thread=False)
+    writer.execute("PRAGMA busy_timeout=5000")
+    return writer
+
+
 def embed_segments(
     conn: sqlite3.Connection,
     model_name: str = DEFAULT_MODEL,
     batch_size: int = 32,
+    matrix: Optional[EmbeddingMatrix] = None,
 ):
     """
     Generate embeddings for all segments without embeddings.
@@ -83,8 +422,14 @@ def embed_segments(
         conn: Database connection
         model_name: Name of sentence-transformers model
         batch_size: Batch size for embedding generation
+        matrix: On-disk embedding matrix to append to (default: the one
+            beside the database file; in-memory databases have none)
     """
-    from .db import get_segments_without_embeddings, update_segment_embedding
+    from .db import get_segments_without_embeddings, update_segment_embeddings
+
+    matrix = matrix or EmbeddingMatrix.for_connection(conn)
+    if matrix is not None:
+        backfill_matrix(conn, matrix)
 
     # Get segments without embeddings
     segments = get_segments_without_embeddings(conn)
@@ -98,21 +443,54 @@ def embed_segments(
     # Initialize generator
     generator = EmbeddingGenerator(model_name)
 
-    # Process in batches
-    for i in range(0, len(segments), batch_size):
-        batch = segments[i:i+batch_size]
-        texts = [seg['text'] for seg in batch]
-
-        # Generate embeddings
-        embeddings = generator.embed_texts(texts)
-
-        # Store in database
-        for seg, embedding in zip(batch, embeddings):
-            # Convert to bytes for storage
-            embedding_bytes = embedding.astype(np.float32).tobytes()
-            update_segment_embedding(conn, seg['id'], embedding_bytes)
-
-        logger.info(f"Embedded {min(i+batch_size, len(segments))}/{len(segments)} segments")
+    # encode() only length-sorts within the texts it is given; sorting the
+    # whole worklist first keeps each batch's padding short. Updates are
+    # keyed by id, so the processing order does not matter.
+    segments.sort(key=lambda seg: len(seg['text']))
+
+    # Database writes run on a background thread with their own connection,
+    # so each batch's commit overlaps the next batch's encode. At most one
+    # write is in flight, which also surfaces write errors promptly.
+    writer = _writer_connection(conn)
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # Process in batches
+            for i in range(0, len(segments), batch_size):
+                batch = segments[i:i+batch_size]
+                texts = [seg['text'] for seg in batch]
+
+                # Generate embeddings
+                embeddings = generator.embed_texts(texts)
+
+                # Convert the whole batch to bytes at once and slice per row
+                matrix_rows = np.ascontiguousarray(embeddings, dtype=np.float32)
+                buffer = matrix_rows.tobytes()
+                row_bytes = matrix_rows.shape[1] * matrix_rows.itemsize
+                pairs = [
+                    (buffer[j * row_bytes:(j + 1) * row_bytes], seg['id'])
+                    for j, seg in enumerate(batch)
+                ]
+
+                # Append to the search matrix first: a crash before the
+                # database update only leaves unreferenced rows behind
+                first_row = matrix.append(matrix_rows) if matrix is not None else None
+
+                # Store in database, one transaction per batch
+                if pending is not None:
+                    pending.result()
+                if writer is None:
+                    update_segment_embeddings(conn, pairs, first_row)
+                else:
+                    pending = pool.submit(update_segment_embeddings, writer, pairs, first_row)
+
+                logger.info(f"Embedded {min(i+batch_size, len(segments))}/{len(segments)} segments")
+
+            if pending is not None:
+                pending.result()
+    finally:
+        if writer is not None:
+            writer.close()
 
     logger.info("Embedding generation complete")
 
@@ -142,5 +520,5 @@ def index_segments(
     logger.info(f"Inserted {len(segment_ids)} segments")
 
     # Generate embeddings if requested
-    if generate_embeddings and SENTENCE_TRANSFORMERS_AVAILABLE:
+    if generate_embeddings and (ONNX_AVAILABLE if _onnx_requested() else SENTENCE_TRANSFORMERS_AVAILABLE):
         embed_segments(conn, model_name)
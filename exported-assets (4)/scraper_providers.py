@@ -8,7 +8,11 @@ import random
 import re
 import logging
 import json
+import shelve
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
@@ -18,13 +22,73 @@ import os
 import requests
 import feedparser
 import trafilatura
+from trafilatura.settings import use_config
 from youtube_transcript_api import YouTubeTranscriptApi
 import yt_dlp
 
+# Optional: blingfire's compiled sentence splitter (handles abbreviations)
+try:
+    import blingfire
+except ImportError:
+    blingfire = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "embed/ID" and "watch?v=ID" are both matched by the "/" and "v=" branches
+_VIDEO_ID_RE = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_SECTION_SPLIT_RE = re.compile(r'\n#{1,3}\s+')
+_BLANK_LINES_RE = re.compile(r'\n{2,}')
+# Runs of lines not separated by a blank line, i.e. str.split('\n\n') pieces
+_PARAGRAPH_RE = re.compile(r'[^\n]+(?:\n(?!\n)[^\n]+)*')
+_WIKI_TITLE_RE = re.compile(r'wikipedia\.org/wiki/([^#?]+)')
+
+# Built once and shared: trafilatura otherwise re-reads its default config
+# on every extract() call
+_TRAFILATURA_CONFIG = use_config()
+_TRAFILATURA_CONFIG.set("DEFAULT", "EXTRACTION_TIMEOUT", "10")
+
+
+# Concurrency caps for page fetches: per host, so a feed whose articles all
+# live on one CDN does not trip its rate limits, and overall, to bound
+# open sockets when many hosts are crawled at once
+MAX_REQUESTS_PER_HOST = 8
+MAX_REQUESTS_IN_FLIGHT = 64
+
+_IN_FLIGHT = threading.BoundedSemaphore(MAX_REQUESTS_IN_FLIGHT)
+_HOST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+
+@contextmanager
+def _host_slot(url: str):
+    """Hold one of the URL host's request slots (and a global one)."""
+    host = urlparse(url).netloc.lower()
+    with _HOST_SLOTS_LOCK:
+        slot = _HOST_SLOTS.get(host)
+        if slot is None:
+            slot = _HOST_SLOTS[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+    with slot, _IN_FLIGHT:
+        yield
+
+
+def _iter_sections(text: str) -> Iterable[str]:
+    """Yield the pieces of ``_SECTION_SPLIT_RE.split(text)`` one at a time."""
+    start = 0
+    for match in _SECTION_SPLIT_RE.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+def _split_sentences(text: str) -> List[str]:
+    """Split text into sentences, using blingfire when it is installed."""
+    if blingfire is not None:
+        return [s for s in blingfire.text_to_sentences(text).split('\n') if s]
+    return _SENTENCE_SPLIT_RE.split(text)
+
 
 class Source:
     """Represents a content source."""
@@ -64,13 +128,46 @@ class Segment:
         self.meta_json = meta_json or {}
 
 
+# Per-host state shared by all providers in the process, so running several
+# providers against one site fetches robots.txt once and shares one rate
+# clock for that host
+_ROBOTS_CACHE: Dict[str, Tuple[Optional[RobotFileParser], float, float]] = {}
+_ROBOTS_LOCK = threading.Lock()
+_RATE_LIMITERS: Dict[str, 'RateLimiter'] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
 class RobotsChecker:
-    """Checks robots.txt compliance."""
+    """Checks robots.txt compliance.
+
+    robots.txt files are fetched through the provider's pooled session and
+    the responses are kept for ``success_ttl`` seconds (``max_cache_age`` by
+    default), both in memory and in a shelve file so later runs skip the
+    fetch. Failed fetches and 5xx answers are remembered in memory only, for
+    the much shorter ``failure_ttl``, so a flaky host is neither re-asked on
+    every URL nor judged by a transient error for an hour.
+    """
 
-    def __init__(self, user_agent: str, max_cache_age: int = 3600):
+    def __init__(
+        self,
+        user_agent: str,
+        max_cache_age: int = 3600,
+        session: Optional[requests.Session] = None,
+        cache_path: Optional[str] = None,
+        success_ttl: Optional[float] = None,
+        failure_ttl: float = 60.0,
+    ):
         self.user_agent = user_agent
         self.max_cache_age = max_cache_age
-        self._cache: Dict[str, Tuple[RobotFileParser, float]] = {}
+        self.success_ttl = max_cache_age if success_ttl is None else success_ttl
+        self.failure_ttl = failure_ttl
+        self.session = session or requests.Session()
+        if cache_path is None:
+            cache_path = os.path.join(os.environ.get('DATA_DIR', 'data'), 'robots_cache.db')
+        self.cache_path = cache_path
+        # Shared by every checker: parsed rules do not depend on the agent
+        self._cache = _ROBOTS_CACHE
+        self._lock = _ROBOTS_LOCK
 
     def can_fetch(self, url: str) -> bool:
         """Check if URL can be fetched according to robots.txt."""
@@ -79,24 +176,79 @@ class RobotsChecker:
 
         # Check cache
         now = time.time()
-        if robots_url in self._cache:
-            rp, cached_time = self._cache[robots_url]
-            if now - cached_time < self.max_cache_age:
-                return self._check_permission(rp, url)
+        with self._lock:
+            cached = self._cache.get(robots_url) or self._load_cached(robots_url)
+        if cached is not None:
+            rp, cached_time, ttl = cached
+            if now - cached_time < ttl:
+                # A remembered failure means the rules are unknown: fail open
+                return True if rp is None else self._check_permission(rp, url)
 
         # Fetch and parse robots.txt
-        rp = RobotFileParser()
-        rp.set_url(robots_url)
-
         try:
-            rp.read()
-            self._cache[robots_url] = (rp, now)
-            return self._check_permission(rp, url)
+            response = self.session.get(robots_url, timeout=5)
         except Exception as e:
             logger.warning(f"Could not read robots.txt for {robots_url}: {e}")
+            with self._lock:
+                self._cache[robots_url] = (None, now, self.failure_ttl)
             # Fail open if robots.txt cannot be read
             return True
 
+        # Same status handling as RobotFileParser.read()
+        ttl, persist = self.success_ttl, True
+        if response.status_code in (401, 403):
+            record = ('disallow', None)
+        elif 400 <= response.status_code < 500:
+            record = ('allow', None)
+        elif response.status_code >= 500:
+            record = ('disallow', None)
+            ttl, persist = self.failure_ttl, False
+        else:
+            record = ('parse', response.text.splitlines())
+
+        rp = self._build_parser(robots_url, record)
+        with self._lock:
+            self._cache[robots_url] = (rp, now, ttl)
+            if persist:
+                self._store_cached(robots_url, record, now)
+        return self._check_permission(rp, url)
+
+    @staticmethod
+    def _build_parser(robots_url: str, record: Tuple[str, Optional[List[str]]]) -> RobotFileParser:
+        kind, lines = record
+        rp = RobotFileParser()
+        rp.set_url(robots_url)
+        if kind == 'disallow':
+            rp.disallow_all = True
+        elif kind == 'allow':
+            rp.allow_all = True
+        else:
+            rp.parse(lines or [])
+        return rp
+
+    def _load_cached(
+        self, robots_url: str
+    ) -> Optional[Tuple[Optional[RobotFileParser], float, float]]:
+        try:
+            with shelve.open(self.cache_path, flag='r') as db:
+                entry = db.get(robots_url)
+        except Exception:
+            return None
+        if not entry:
+            return None
+        record, cached_time = entry
+        cached = (self._build_parser(robots_url, record), cached_time, self.success_ttl)
+        self._cache[robots_url] = cached
+        return cached
+
+    def _store_cached(self, robots_url: str, record, cached_time: float):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with shelve.open(self.cache_path) as db:
+                db[robots_url] = (record, cached_time)
+        except Exception as e:
+            logger.debug(f"Could not persist robots.txt cache: {e}")
+
     def _check_permission(self, rp: RobotFileParser, url: str) -> bool:
         """Check if user agent can fetch URL."""
         try:
@@ -107,26 +259,46 @@ class RobotsChecker:
 
 
 class RateLimiter:
-    """Rate limiter for polite scraping."""
+    """Rate limiter for polite scraping.
+
+    Thread-safe: each caller reserves the next free slot under a lock and
+    then sleeps outside it, so concurrent workers stay ``min_delay`` apart.
+    """
 
     def __init__(self, max_rps: float = 1.0, random_delay: bool = True):
         self.max_rps = max_rps
         self.random_delay = random_delay
         self.min_delay = 1.0 / max_rps
         self._last_request = 0.0
+        self._lock = threading.Lock()
 
     def wait(self):
         """Wait to respect rate limit."""
-        now = time.time()
-        elapsed = now - self._last_request
-
-        if elapsed < self.min_delay:
-            delay = self.min_delay - elapsed
-            if self.random_delay:
-                delay += random.uniform(0, self.min_delay * 0.5)
+        with self._lock:
+            now = time.time()
+            slot = now
+            if now - self._last_request < self.min_delay:
+                slot = self._last_request + self.min_delay
+                if self.random_delay:
+                    slot += random.uniform(0, self.min_delay * 0.5)
+            self._last_request = slot
+
+        delay = slot - time.time()
+        if delay > 0:
             time.sleep(delay)
 
-        self._last_request = time.time()
+
+def _host_rate_limiter(url: str, max_rps: float) -> RateLimiter:
+    """Return the shared limiter for the URL's host, at the slowest rate asked."""
+    host = urlparse(url).netloc.lower()
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(host)
+        if limiter is None:
+            limiter = _RATE_LIMITERS[host] = RateLimiter(max_rps=max_rps)
+        elif max_rps < limiter.max_rps:
+            limiter.max_rps = max_rps
+            limiter.min_delay = 1.0 / max_rps
+    return limiter
 
 
 class Provider(ABC):
@@ -140,10 +312,27 @@ class Provider(ABC):
     ):
         contact = os.environ.get("SCRAPER_CONTACT", "your-email@example.com")
         self.user_agent = user_agent or f"ContradictionFinder/1.0 ({contact})"
-        self.robots_checker = RobotsChecker(self.user_agent) if check_robots else None
-        self.rate_limiter = RateLimiter(max_rps=max_rps)
+        self.max_rps = max_rps
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": self.user_agent})
+        self.robots_checker = (
+            RobotsChecker(self.user_agent, session=self.session) if check_robots else None
+        )
+
+    def wait_for(self, url: str):
+        """Wait for the URL host's shared rate limiter."""
+        _host_rate_limiter(url, self.max_rps).wait()
+
+    def fetch_page(self, url: str, timeout: float = 30) -> bytes:
+        """Download a page through the pooled session.
+
+        Returns the raw body; trafilatura detects the charset from the
+        bytes and the page's meta tags.
+        """
+        with _host_slot(url):
+            response = self.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
 
     def check_robots_txt(self, url: str) -> bool:
         """Check if URL can be scraped according to robots.txt."""
@@ -220,14 +409,16 @@ class YouTubeProvider(Provider):
                 published_at=published_at,
             )
 
-            # Create segments from transcript
+            # Create segments from transcript; every cue shares one
+            # metadata dict
+            meta = {'video_id': video_id}
             segments = []
             for entry in transcript:
                 segment = Segment(
                     text=entry['text'],
                     ts_start=entry['start'],
                     ts_end=entry['start'] + entry.get('duration', 0),
-                    meta_json={'video_id': video_id}
+                    meta_json=meta
                 )
                 segments.append(segment)
 
@@ -238,23 +429,16 @@ class YouTubeProvider(Provider):
 
     def _extract_video_id(self, url: str) -> Optional[str]:
         """Extract video ID from YouTube URL."""
-        patterns = [
-            r'(?:v=|/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed/)([0-9A-Za-z_-]{11})',
-            r'(?:watch\?v=)([0-9A-Za-z_-]{11})',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-
-        return None
+        match = _VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
 
 
 class RSSProvider(Provider):
     """Provider for RSS/Atom feeds."""
 
+    # Concurrent article downloads per feed
+    max_workers = 4
+
     def collect(self, url: str, **kwargs) -> Iterable[Tuple[Source, List[Segment]]]:
         """
         Collect items from RSS/Atom feed.
@@ -263,72 +447,109 @@ class RSSProvider(Provider):
             url: Feed URL
         """
         try:
+            # Fetch through the pooled session (keep-alive, our User-Agent,
+            # gzip) and hand feedparser the bytes rather than the URL
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+
             # Parse feed
-            feed = feedparser.parse(url)
+            feed = feedparser.parse(
+                response.content,
+                response_headers={k.lower(): v for k, v in response.headers.items()},
+            )
 
             if feed.bozo and not feed.entries:
                 logger.error(f"Failed to parse feed: {url}")
                 return
 
-            # Process each entry
-            for entry in feed.entries:
-                self.rate_limiter.wait()
+            # Article downloads are network-bound, so a few run concurrently
+            # while the shared rate limiter keeps requests spaced out.
+            # Extraction stays on this thread: it is CPU-bound, and
+            # trafilatura's extraction timeout relies on signals, which only
+            # work on the main thread.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for prepared in pool.map(self._download_entry, feed.entries):
+                    if prepared is None:
+                        continue
+                    source, downloaded = prepared
+                    segments = self._segments_from_html(source.url, downloaded)
+
+                    if segments:
+                        yield source, segments
 
-                article_url = entry.get('link', '')
-                if not article_url:
-                    continue
+        except Exception as e:
+            logger.error(f"Error collecting RSS feed {url}: {e}")
 
-                # Check robots.txt
-                if not self.check_robots_txt(article_url):
-                    continue
+    def _download_entry(self, entry) -> Optional[Tuple[Source, bytes]]:
+        """Build the entry's Source and download its article (worker thread)."""
+        article_url = entry.get('link', '')
+        if not article_url:
+            return None
 
-                # Get published date
-                published_at = None
-                for date_field in ['published_parsed', 'updated_parsed']:
-                    if date_field in entry and entry[date_field]:
-                        try:
-                            published_at = datetime(*entry[date_field][:6])
-                            break
-                        except:
-                            pass
+        self.wait_for(article_url)
 
-                # Create source
-                source = Source(
-                    source_type='rss',
-                    title=entry.get('title', 'Untitled'),
-                    url=article_url,
-                    published_at=published_at,
-                )
+        # Check robots.txt
+        if not self.check_robots_txt(article_url):
+            return None
 
-                # Fetch and extract article content
-                segments = self._extract_article_segments(article_url)
+        # Get published date
+        published_at = None
+        for date_field in ['published_parsed', 'updated_parsed']:
+            if date_field in entry and entry[date_field]:
+                try:
+                    published_at = datetime(*entry[date_field][:6])
+                    break
+                except:
+                    pass
 
-                if segments:
-                    yield source, segments
+        # Create source
+        source = Source(
+            source_type='rss',
+            title=entry.get('title', 'Untitled'),
+            url=article_url,
+            published_at=published_at,
+        )
 
+        try:
+            downloaded = self.fetch_page(article_url)
         except Exception as e:
-            logger.error(f"Error collecting RSS feed {url}: {e}")
+            logger.error(f"Error downloading article {article_url}: {e}")
+            return None
+
+        if not downloaded:
+            return None
+        return source, downloaded
 
     def _extract_article_segments(self, url: str) -> List[Segment]:
         """Extract article content and split into segments."""
         try:
             # Download page
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
-                return []
+            downloaded = self.fetch_page(url)
+        except Exception as e:
+            logger.error(f"Error extracting article {url}: {e}")
+            return []
 
+        if not downloaded:
+            return []
+        return self._segments_from_html(url, downloaded)
+
+    def _segments_from_html(self, url: str, downloaded: bytes) -> List[Segment]:
+        """Extract main text from downloaded HTML and split into segments."""
+        try:
             # Extract main text
             text = trafilatura.extract(
                 downloaded,
                 include_comments=False,
                 include_tables=False,
+                no_fallback=True,
+                config=_TRAFILATURA_CONFIG,
             )
 
             if not text:
                 return []
 
             # Split into segments (1-3 sentences each)
-            sentences = re.split(r'(?<=[.!?])\s+', text)
+            sentences = _split_sentences(text)
             segments = []
 
             for i in range(0, len(sentences), 2):
@@ -381,8 +602,9 @@ class WikipediaProvider(Provider):
             # Fetch page content
             page_url = f"{self.api_base}/page/{page}/html"
 
-            self.rate_limiter.wait()
-            response = self.session.get(page_url)
+            self.wait_for(page_url)
+            with _host_slot(page_url):
+                response = self.session.get(page_url)
             response.raise_for_status()
 
             html_content = response.text
@@ -392,6 +614,8 @@ class WikipediaProvider(Provider):
                 html_content,
                 include_comments=False,
                 include_tables=True,
+                no_fallback=True,
+                config=_TRAFILATURA_CONFIG,
             )
 
             if not text:
@@ -407,26 +631,28 @@ class WikipediaProvider(Provider):
             )
 
             # Split by sections (simple heuristic)
-            sections = re.split(r'\n#{1,3}\s+', text)
             segments = []
 
-            for idx, section in enumerate(sections):
+            for idx, section in enumerate(_iter_sections(text)):
                 section = section.strip()
                 if section:
+                    # One metadata dict per section, shared by its paragraphs
+                    meta = {'page': page, 'section_idx': idx}
+
                     # Further split long sections
                     if len(section) > 500:
-                        paragraphs = section.split('\n\n')
-                        for para in paragraphs:
-                            if para.strip():
+                        for match in _PARAGRAPH_RE.finditer(section):
+                            para = match.group().strip()
+                            if para:
                                 segment = Segment(
-                                    text=para.strip(),
-                                    meta_json={'page': page, 'section_idx': idx}
+                                    text=para,
+                                    meta_json=meta
                                 )
                                 segments.append(segment)
                     else:
                         segment = Segment(
                             text=section,
-                            meta_json={'page': page, 'section_idx': idx}
+                            meta_json=meta
                         )
                         segments.append(segment)
 
@@ -437,7 +663,7 @@ class WikipediaProvider(Provider):
 
     def _extract_page_title(self, url: str) -> Optional[str]:
         """Extract page title from Wikipedia URL."""
-        match = re.search(r'wikipedia\.org/wiki/([^#?]+)', url)
+        match = _WIKI_TITLE_RE.search(url)
         if match:
             return match.group(1)
         return None
@@ -503,8 +729,9 @@ class HansardProvider(Provider):
             # structure varies. This would need adjustment based on actual API.
             search_url = f"{self.api_base}/search/debates.json"
 
-            self.rate_limiter.wait()
-            response = self.session.get(search_url, params=params)
+            self.wait_for(search_url)
+            with _host_slot(search_url):
+                response = self.session.get(search_url, params=params)
 
             # If API is not available, log and return
             if response.status_code != 200:
@@ -555,9 +782,15 @@ class HansardProvider(Provider):
 class GenericProvider(Provider):
     """Provider for generic web pages with domain whitelist."""
 
+    # Concurrent page downloads per collect() call
+    max_workers = 8
+
     def __init__(self, allowed_domains: List[str], *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.allowed_domains = [d.lower() for d in allowed_domains]
+        # Exact match via the set, subdomains via one C-level endswith
+        self._allow_set = frozenset(self.allowed_domains)
+        self._allow_suffixes = tuple('.' + d for d in self.allowed_domains)
 
     def collect(self, urls: List[str], **kwargs) -> Iterable[Tuple[Source, List[Segment]]]:
         """
@@ -566,17 +799,20 @@ class GenericProvider(Provider):
         Args:
             urls: List of URLs to scrape
         """
+        # Filter first so only permitted URLs reach the download pool
+        permitted = []
         for url in urls:
             # Check if domain is whitelisted
             parsed = urlparse(url)
             domain = parsed.netloc.lower()
 
-            # Remove www. prefix for comparison
-            domain_clean = domain.replace('www.', '')
+            # Remove a leading www. for comparison (only the prefix: an inner
+            # "www." is part of the name)
+            domain_clean = domain[4:] if domain.startswith('www.') else domain
 
-            allowed = any(
-                domain_clean == allowed or domain_clean.endswith('.' + allowed)
-                for allowed in self.allowed_domains
+            allowed = (
+                domain_clean in self._allow_set
+                or domain_clean.endswith(self._allow_suffixes)
             )
 
             if not allowed:
@@ -589,62 +825,89 @@ class GenericProvider(Provider):
             if not self.check_robots_txt(url):
                 continue
 
-            try:
-                self.rate_limiter.wait()
+            permitted.append((url, domain))
+
+        if not permitted:
+            return
 
-                # Fetch and extract content
-                downloaded = trafilatura.fetch_url(url)
+        # Downloads are network-bound and overlap on worker threads (each
+        # still waits on the rate limiter); extraction runs here, in order,
+        # while later downloads are in flight.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pages = pool.map(self._download, [url for url, _ in permitted])
+            for (url, domain), downloaded in zip(permitted, pages):
                 if not downloaded:
                     logger.warning(f"Could not download {url}")
                     continue
 
-                text = trafilatura.extract(
-                    downloaded,
-                    include_comments=False,
-                    include_tables=False,
-                )
-
-                if not text:
-                    logger.warning(f"No content extracted from {url}")
+                try:
+                    result = self._build_source(url, domain, downloaded)
+                except Exception as e:
+                    logger.error(f"Error collecting from {url}: {e}")
                     continue
 
-                # Get metadata
-                metadata = trafilatura.extract_metadata(downloaded)
+                if result is not None:
+                    yield result
 
-                title = 'Untitled'
-                published_at = None
+    def _download(self, url: str) -> Optional[bytes]:
+        """Fetch a page (worker thread); None on failure."""
+        try:
+            self.wait_for(url)
+            return self.fetch_page(url)
+        except Exception as e:
+            logger.error(f"Error collecting from {url}: {e}")
+            return None
 
-                if metadata:
-                    title = metadata.title or title
-                    if metadata.date:
-                        try:
-                            published_at = datetime.fromisoformat(metadata.date)
-                        except:
-                            pass
+    def _build_source(
+        self,
+        url: str,
+        domain: str,
+        downloaded: bytes,
+    ) -> Optional[Tuple[Source, List[Segment]]]:
+        """Extract text and metadata from a downloaded page."""
+        text = trafilatura.extract(
+            downloaded,
+            include_comments=False,
+            include_tables=False,
+            no_fallback=True,
+            config=_TRAFILATURA_CONFIG,
+        )
+
+        if not text:
+            logger.warning(f"No content extracted from {url}")
+            return None
 
-                # Create source
-                source = Source(
-                    source_type='generic',
-                    title=title,
-                    url=url,
-                    published_at=published_at,
-                )
+        # Get metadata
+        metadata = trafilatura.extract_metadata(downloaded)
 
-                # Split into segments
-                paragraphs = text.split('\n\n')
-                segments = []
+        title = 'Untitled'
+        published_at = None
 
-                for para in paragraphs:
-                    para = para.strip()
-                    if para and len(para) > 50:  # Skip very short paragraphs
-                        segment = Segment(
-                            text=para,
-                            meta_json={'url': url, 'domain': domain}
-                        )
-                        segments.append(segment)
+        if metadata:
+            title = metadata.title or title
+            if metadata.date:
+                try:
+                    published_at = datetime.fromisoformat(metadata.date)
+                except:
+                    pass
 
-                if segments:
-                    yield source, segments
+        # Create source
+        source = Source(
+            source_type='generic',
+            title=title,
+            url=url,
+            published_at=published_at,
+        )
+
+        # Split into segments, skipping very short paragraphs. Every segment
+        # of the page carries the same metadata, so they share one dict.
+        meta = {'url': url, 'domain': domain}
+        segments = [
+            Segment(text=para, meta_json=meta)
+            for para in (part.strip() for part in _BLANK_LINES_RE.split(text))
+            if len(para) > 50
+        ]
 
-            except Exception as e:
-                logger.error(f"Error collecting from {url}: {e}")
+        if not segments:
+            return None
+        return source, segments
@@ -3,11 +3,13 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from backend.config import get_config
 
 MODEL_NAME = "cross-encoder/nli-deberta-v3-xsmall"
 OUTPUT_DIR = Path("backend/nli_onnx")
+CALIBRATION_PAIRS = 200
 
 
 def main() -> int:
@@ -26,8 +28,72 @@ def main() -> int:
         task="text-classification",
     )
     print(f"Exported {model_name} to {OUTPUT_DIR}")
+
+    try:
+        from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    except Exception:  # pragma: no cover - optional dependency
+        print("Install onnxruntime to write the int8 quantized model", file=sys.stderr)
+        return 0
+    quantized = OUTPUT_DIR / "model.int8.onnx"
+    # Static QDQ quantization bakes activation scales into the graph, so the
+    # int8 kernels run without recomputing scales on every forward pass.
+    # Signed int8 activations select the VNNI path on x86.
+    quantize_static(
+        OUTPUT_DIR / "model.onnx",
+        quantized,
+        _CalibrationReader(OUTPUT_DIR / "model.onnx", _calibration_pairs()),
+        quant_format=QuantFormat.QDQ,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    print(f"Wrote int8 static-quantized model to {quantized}")
     return 0
 
 
+_FALLBACK_PAIRS = [
+    ("I always recycle every plastic bottle I use.", "I never recycle anything."),
+    ("Taxes will not rise under this government.", "We are raising income tax next year."),
+    ("We will build more homes.", "Housing construction is a priority."),
+    ("The sky is blue.", "The sky is not blue."),
+]
+
+
+def _calibration_pairs(limit: int = CALIBRATION_PAIRS) -> List[Tuple[str, str]]:
+    """Adjacent corpus segments as (premise, hypothesis) pairs, if any exist."""
+    texts: List[str] = []
+    try:
+        from backend.db import CorpusDatabase
+
+        rows = CorpusDatabase().db.execute(
+            "SELECT text FROM segments ORDER BY random() LIMIT ?", [limit + 1]
+        )
+        texts = [row[0] for row in rows.fetchall() if row[0]]
+    except Exception as exc:  # pragma: no cover - corpus is optional here
+        print(f"Corpus unavailable for calibration ({exc}); using built-in pairs", file=sys.stderr)
+    pairs = list(zip(texts, texts[1:]))
+    return pairs if len(pairs) >= len(_FALLBACK_PAIRS) else _FALLBACK_PAIRS
+
+
+class _CalibrationReader:
+    """``CalibrationDataReader`` feeding tokenized pairs one batch at a time."""
+
+    def __init__(self, model_path: Path, pairs: Sequence[Tuple[str, str]], batch_size: int = 8) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        input_names = {node.name for node in ort.InferenceSession(str(model_path)).get_inputs()}
+        tokenizer = AutoTokenizer.from_pretrained(OUTPUT_DIR)
+        batches = []
+        for start in range(0, len(pairs), batch_size):
+            premises, hypotheses = map(list, zip(*pairs[start : start + batch_size]))
+            encoded = tokenizer(premises, hypotheses, padding=True, truncation=True, return_tensors="np")
+            batches.append({key: value for key, value in encoded.items() if key in input_names})
+        self._batches = iter(batches)
+
+    def get_next(self) -> Optional[Dict[str, object]]:
+        return next(self._batches, None)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -11,3 +11,20 @@ def test_config_paths_created(tmp_path, monkeypatch):
     assert (data_dir / "raw").exists()
     sample_dir = config.REPO_ROOT / resolved["SAMPLE_DIR"]
     assert sample_dir.exists()
+
+
+def test_config_is_cached_until_reload(monkeypatch, tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("HF_NLI_MODEL=first\n")
+    monkeypatch.setattr(config, "REPO_ROOT", tmp_path)
+    config.reload_config()
+    try:
+        assert config.get_config()["HF_NLI_MODEL"] == "first"
+        env_file.write_text("HF_NLI_MODEL=second\n")
+        assert config.get_config()["HF_NLI_MODEL"] == "first"
+        config.reload_config()
+        assert config.get_config()["HF_NLI_MODEL"] == "second"
+        monkeypatch.setenv("HF_NLI_MODEL", "from-env")
+        assert config.get_config()["HF_NLI_MODEL"] == "from-env"
+    finally:
+        config.reload_config()
@@ -0,0 +1,107 @@
+import json
+import math
+import sqlite3
+
+import pytest
+
+pytest.importorskip("sqlite_utils", reason="sqlite-utils is required for database tests")
+
+from backend.db import CorpusDatabase
+
+
+def test_embeddings_round_trip_as_blobs(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db = CorpusDatabase()
+    source_id = db.add_source("Example", "text", "example.txt")
+    seg_id = db.add_segment(source_id, "hello", None, None, [3.0, 0.0, 4.0])
+    row = db.db.table("embeddings").get(seg_id)
+    assert isinstance(row["vector"], bytes)
+    assert row["dim"] == 3
+    (_, vector), = db.fetch_segments_with_embeddings()
+    assert [round(float(x), 6) for x in vector] == [0.6, 0.0, 0.8]
+
+
+def test_legacy_json_vectors_are_migrated(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db_path = tmp_path / "db" / "corpus.db"
+    db_path.parent.mkdir(parents=True)
+    # Schema written before vectors moved to BLOBs: no dim column, JSON text.
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE sources (
+                id INTEGER PRIMARY KEY, title TEXT, source_type TEXT, url_or_path TEXT,
+                published_at TEXT, author TEXT, extra_json TEXT
+            );
+            CREATE TABLE segments (
+                id INTEGER PRIMARY KEY, source_id INTEGER, text TEXT,
+                ts_start FLOAT, ts_end FLOAT, doc_id TEXT
+            );
+            CREATE TABLE embeddings (segment_id INTEGER PRIMARY KEY, vector TEXT);
+            INSERT INTO sources (id, title, source_type, url_or_path, extra_json)
+                VALUES (1, 'Example', 'text', 'example.txt', '{}');
+            INSERT INTO segments (id, source_id, text) VALUES (1, 1, 'hello');
+            """
+        )
+        conn.execute("INSERT INTO embeddings VALUES (1, ?)", [json.dumps([0.0, 2.0])])
+    conn.close()
+
+    migrated = CorpusDatabase()
+    row = migrated.db.table("embeddings").get(1)
+    assert isinstance(row["vector"], bytes)
+    assert row["dim"] == 2
+    (_, vector), = migrated.fetch_segments_with_embeddings()
+    assert math.isclose(float(vector[1]), 1.0)
+
+
+def test_int8_storage_is_quarter_size(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db = CorpusDatabase(store_int8=True)
+    source_id = db.add_source("Example", "text", "example.txt")
+    seg_id = db.add_segment(source_id, "hello", None, None, [3.0, 0.0, 4.0])
+    row = db.db.table("embeddings").get(seg_id)
+    assert len(row["vector"]) == row["dim"] == 3
+    (_, vector), = db.fetch_segments_with_embeddings()
+    assert [round(float(x), 2) for x in vector] == [0.6, 0.0, 0.8]
+
+
+def test_float16_storage_is_half_size(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db = CorpusDatabase(store_dtype="float16")
+    source_id = db.add_source("Example", "text", "example.txt")
+    (seg_id,) = db.add_segments_bulk(source_id, [("hello", None, None, [3.0, 0.0, 4.0], None)])
+    row = db.db.table("embeddings").get(seg_id)
+    assert len(row["vector"]) == 2 * row["dim"] == 6
+    (_, vector), = db.fetch_segments_with_embeddings()
+    assert [round(float(x), 3) for x in vector] == [0.6, 0.0, 0.8]
+
+
+def test_search_segments_uses_full_text_index(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db = CorpusDatabase()
+    source_id = db.add_source("Example", "text", "example.txt")
+    db.add_segments_bulk(
+        source_id,
+        [
+            ("Taxes will not rise", None, None, [1.0, 0.0], None),
+            ("We will build more homes", None, None, [0.0, 1.0], None),
+        ],
+    )
+    hits = db.search_segments("homes")
+    assert [hit.text for hit in hits] == ["We will build more homes"]
+    assert db.search_segments('"unbalanced') == []
+
+
+def test_load_embedding_matrix_and_fetch_in_order(monkeypatch, tmp_path):
+    pytest.importorskip("numpy")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    db = CorpusDatabase()
+    source_id = db.add_source("Example", "text", "example.txt")
+    first, second = db.add_segments_bulk(
+        source_id,
+        [("first", None, None, [1.0, 0.0], None), ("second", None, None, [0.0, 2.0], None)],
+    )
+    ids, matrix = db.load_embedding_matrix()
+    assert list(ids) == [first, second]
+    assert matrix.shape == (2, 2)
+    assert [seg.text for seg in db.fetch_segments([second, first])] == ["second", "first"]
@@ -12,14 +12,14 @@ class DummyEmbedder:
     def __init__(self, *args, **kwargs):
         pass
 
-    def encode(self, texts):
+    def encode(self, texts, **kwargs):
         return [[1.0, 0.0, 0.0] for _ in texts]
 
 
 def test_ingest_sample_subtitle(monkeypatch, tmp_path):
     monkeypatch.setenv("DATA_DIR", "data/test_ingest")
     monkeypatch.setattr(ingest, "SentenceTransformer", DummyEmbedder)
-    ingest._EMBEDDER = None
+    monkeypatch.setattr(ingest, "get_embedder", lambda name: DummyEmbedder())
     count = ingest.ingest_subtitle(Path("samples/media/your_clip.srt"), source_title="Sample clip")
     assert count > 0
     db = CorpusDatabase()
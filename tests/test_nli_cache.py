@@ -0,0 +1,19 @@
+from backend.nli_cache import ScoreCache
+
+
+def test_score_cache_round_trips_through_disk(tmp_path):
+    path = tmp_path / "scores.sqlite"
+    cache = ScoreCache("model-a", path, maxsize=1)
+    first, second = cache.key("p1", "h1"), cache.key("p2", "h2")
+    cache.put_many([(first, 0.25), (second, 0.75)])
+    assert cache.get_many([first, second]) == {first: 0.25, second: 0.75}
+
+    reopened = ScoreCache("model-a", path)
+    assert reopened.get_many([first, reopened.key("p3", "h3")]) == {first: 0.25}
+
+
+def test_score_cache_keys_depend_on_namespace_and_pair_boundary(tmp_path):
+    cache_a = ScoreCache("model-a", None)
+    cache_b = ScoreCache("model-b", None)
+    assert cache_a.key("p", "h") != cache_b.key("p", "h")
+    assert cache_a.key("ab", "c") != cache_a.key("a", "bc")
@@ -10,9 +10,26 @@ class _FakeBackend:
         return [0.42 for _ in pairs]
 
 
+@pytest.fixture(autouse=True)
+def _isolated_data_dir(monkeypatch, tmp_path):
+    # Keep the persistent score cache out of the repo's DATA_DIR.
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("NLI_CACHE", "0")
+
+
 def test_nli_scores_float(monkeypatch):
     monkeypatch.setattr(NLIScorer, "_load_backend", lambda self: _FakeBackend())
     scorer = NLIScorer(model_name="dummy")
     assert abs(scorer.score("premise", "hypothesis") - 0.42) < 1e-6
     batch = scorer.score_batch([("a", "b"), ("c", "d")])
     assert batch == [0.42, 0.42]
+
+
+def test_score_many_keeps_batch_boundaries(monkeypatch):
+    monkeypatch.setattr(NLIScorer, "_load_backend", lambda self: _FakeBackend())
+    scorer = NLIScorer(model_name="dummy-many")
+    assert scorer.score_many([[("a", "b")], [], [("c", "d"), ("e", "f")]]) == [
+        [0.42],
+        [],
+        [0.42, 0.42],
+    ]
@@ -20,3 +20,23 @@ def test_scraper_storage_upsert(tmp_path):
         assert updated2 == 1
         rows = list(store.conn.execute("SELECT COUNT(*) FROM raw_items"))
         assert rows[0][0] == 1
+
+
+def test_scraper_storage_all_items_pages(tmp_path):
+    items = [
+        ScrapedItem(
+            id=f"item-{idx}",
+            url=f"https://example.com/news/{idx}",
+            title=f"Example {idx}",
+            text="Example body",
+            source_name="Example Source",
+            raw_html="<p>Example body</p>",
+        )
+        for idx in range(7)
+    ]
+    with RawItemStore(tmp_path / "raw.sqlite") as store:
+        store.upsert_items(items)
+        paged = list(store.all_items(page_size=3))
+        assert sorted(item.id for item in paged) == sorted(item.id for item in items)
+        assert all(item.raw_html for item in paged)
+        assert all(item.raw_html is None for item in store.all_items(include_html=False))